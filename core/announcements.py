@@ -0,0 +1,46 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ticket_sales_backend import settings
+
+
+def get_announcement_version_key(city_id):
+    return f'event_announcement_version_{city_id}'
+
+
+def get_announcement_cutoff():
+    window = settings.EVENT_ANNOUNCEMENT_CACHE_WINDOW
+    timestamp = int(timezone.now().timestamp()) // window * window
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def get_announcement(city_id, projection, base_url, build_announcement):
+    version = cache.get_or_set(get_announcement_version_key(city_id), 0, None)
+    cutoff = get_announcement_cutoff()
+    base_url_hash = hashlib.md5(base_url.encode()).hexdigest()
+    key = f'event_announcement_{city_id}_{version}_{projection}_{int(cutoff.timestamp())}_{base_url_hash}'
+
+    announcement = cache.get(key)
+    if announcement is None:
+        announcement = list(build_announcement(cutoff))
+        cache.set(key, announcement, settings.EVENT_ANNOUNCEMENT_CACHE_WINDOW)
+    return announcement
+
+
+def invalidate_announcements(city_ids):
+    city_ids = {city_id for city_id in city_ids if city_id is not None}
+
+    def invalidate():
+        for city_id in city_ids:
+            key = get_announcement_version_key(city_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+    if city_ids:
+        transaction.on_commit(invalidate)
@@ -1,6 +1,9 @@
 import os
 import uuid
 
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
 from ticket_sales_backend import settings
 
 
@@ -15,3 +18,12 @@ def handle_uploaded_file(file, folder_name):
         for chunk in file.chunks():
             destination.write(chunk)
     return os.path.join(folder_name, filename)
+
+
+def get_aware_datetime(value):
+    if not value:
+        return None
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f"Invalid datetime: {value}")
+    return date if timezone.is_aware(date) else timezone.make_aware(date)
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Purchase, EventPlace
+from core.seat_map import set_places_availability
+from ticket_sales_backend import settings
+
+
+def get_hold_expiration():
+    return timezone.now() + settings.PURCHASE_HOLD_TTL
+
+
+def release_expired_holds(batch_size):
+    released = 0
+    while True:
+        with transaction.atomic():
+            purchase_ids = list(
+                Purchase.objects.select_for_update(skip_locked=True)
+                .filter(status='booked', expires_at__lte=timezone.now())
+                .order_by('expires_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not purchase_ids:
+                return released
+
+            event_places = list(EventPlace.objects.filter(purchase_id__in=purchase_ids).values_list('id', 'event_id'))
+            Purchase.objects.filter(id__in=purchase_ids).delete()
+            set_places_availability(event_places, True)
+
+        released += len(purchase_ids)
@@ -0,0 +1,98 @@
+from itertools import islice
+
+from django.db import connection
+
+from core.models import Place, EventPlace, EventRequestPlace
+from ticket_sales_backend import settings
+
+PLACE_UPDATE_FIELDS = ['sector', 'row', 'seat', 'x_offset', 'y_offset', 'hall_id']
+
+
+def get_batches(items, batch_size):
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def iter_bulk_create_places(places_data, batch_size=None):
+    for batch in get_batches(places_data, batch_size or settings.PLACE_BULK_BATCH_SIZE):
+        yield Place.objects.bulk_create([Place(**place_data) for place_data in batch])
+
+
+def bulk_update_places(places, places_data, batch_size=None):
+    for place, place_data in zip(places, places_data):
+        for attr, value in place_data.items():
+            setattr(place, attr, value)
+    Place.objects.bulk_update(places, PLACE_UPDATE_FIELDS, batch_size=batch_size or settings.PLACE_BULK_BATCH_SIZE)
+    return places
+
+
+def get_seat_offset(seat_index, seats_per_row, seat_spacing, curvature):
+    center_distance = (seat_index - (seats_per_row - 1) / 2) * seat_spacing
+    return center_distance, curvature * center_distance ** 2
+
+
+def generate_sector_places(hall_id, sector):
+    for row_index in range(sector['rows']):
+        seats_per_row = sector['seats_per_row'] + row_index * sector['seats_increment']
+        row_y = sector['origin_y'] + row_index * sector['row_spacing']
+        for seat_index in range(seats_per_row):
+            x_offset, bow = get_seat_offset(seat_index, seats_per_row, sector['seat_spacing'], sector['curvature'])
+            yield {
+                'hall_id': hall_id,
+                'sector': sector['sector'],
+                'row': sector['first_row'] + row_index,
+                'seat': sector['first_seat'] + seat_index,
+                'x_offset': sector['origin_x'] + x_offset,
+                'y_offset': row_y + bow,
+            }
+
+
+def generate_places(hall_id, sectors):
+    for sector in sectors:
+        yield from generate_sector_places(hall_id, sector)
+
+
+def count_layout_places(sectors):
+    return sum(
+        sector['rows'] * sector['seats_per_row'] + sector['seats_increment'] * sector['rows'] * (sector['rows'] - 1) // 2
+        for sector in sectors
+    )
+
+
+def create_layout_places(hall_id, sectors, batch_size=None):
+    return sum(len(batch) for batch in iter_bulk_create_places(generate_places(hall_id, sectors), batch_size))
+
+
+def bulk_create_event_request_places(event_request_id, places_data, batch_size=None):
+    event_request_places = (EventRequestPlace(event_request_id=event_request_id, **place_data)
+                            for place_data in places_data)
+    for batch in get_batches(event_request_places, batch_size or settings.PLACE_BULK_BATCH_SIZE):
+        EventRequestPlace.objects.bulk_create(batch)
+
+
+def copy_event_places(event_request):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {EventPlace._meta.db_table} (event_id, place_id, price, purchase_id) '
+            f'SELECT %s, place_id, price, NULL FROM {EventRequestPlace._meta.db_table} WHERE event_request_id = %s',
+            [event_request.event_id, event_request.id]
+        )
+        return cursor.rowcount
+
+
+def materialize_event_places(event_request, batch_size=None):
+    if settings.EVENT_PLACES_MATERIALIZATION == 'sql':
+        return copy_event_places(event_request)
+
+    batch_size = batch_size or settings.PLACE_BULK_BATCH_SIZE
+    request_places = EventRequestPlace.objects.filter(event_request_id=event_request.id).order_by('id').values_list(
+        'place_id', 'price'
+    ).iterator(chunk_size=batch_size)
+    event_places = (EventPlace(event_id=event_request.event_id, place_id=place_id, price=price)
+                    for place_id, price in request_places)
+
+    created = 0
+    for batch in get_batches(event_places, batch_size):
+        created += len(EventPlace.objects.bulk_create(batch))
+    return created
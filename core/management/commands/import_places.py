@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.layouts import iter_bulk_create_places
+from core.serializers import PlaceSerializer
+from ticket_sales_backend import settings
+
+
+class Command(BaseCommand):
+    help = 'Imports a hall layout from a JSON file with a list of places'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=settings.PLACE_BULK_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8') as file:
+            place_data = json.load(file)
+        if isinstance(place_data, dict):
+            place_data = place_data.get('places', [])
+
+        serializer = PlaceSerializer(data=place_data, many=True)
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+
+        total = len(serializer.validated_data)
+        imported = 0
+        with transaction.atomic():
+            for batch in iter_bulk_create_places(serializer.validated_data, options['batch_size']):
+                imported += len(batch)
+                self.stdout.write(f'Imported {imported} of {total} places')
+
+        self.stdout.write(self.style.SUCCESS(f'{imported} places were imported successfully'))
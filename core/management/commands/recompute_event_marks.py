@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Event
+from core.ratings import invalidate_rating_histograms
+
+
+class Command(BaseCommand):
+    help = 'Recomputes feedback mark totals and average marks of events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event-ids', type=int, nargs='*')
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options['event_ids']:
+            events = events.filter(id__in=options['event_ids'])
+
+        updated = events.recompute_marks()
+        invalidate_rating_histograms(events.values_list('id', flat=True))
+        self.stdout.write(f'Recomputed marks of {updated} events')
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.holds import release_expired_holds
+from core.outbox import dispatcher
+from ticket_sales_backend import settings
+
+
+class Command(BaseCommand):
+    help = 'Releases places held by booked purchases whose hold time has expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.RELEASE_EXPIRED_HOLDS_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running and check for expired holds every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_holds(options['batch_size'])
+            if released:
+                self.stdout.write(f'Released {released} expired purchases')
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+        dispatcher.drain(settings.OUTBOX_DRAIN_TIMEOUT)
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2024-06-10 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_booked_purchases_expiration(apps, schema_editor):
+    Purchase = apps.get_model('core', 'Purchase')
+    Purchase.objects.filter(status='booked').update(expires_at=timezone.now() + settings.PURCHASE_HOLD_TTL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_eventrequestplace'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(set_booked_purchases_expiration, migrations.RunPython.noop),
+    ]
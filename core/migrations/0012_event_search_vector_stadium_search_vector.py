@@ -0,0 +1,62 @@
+# Generated by Django 5.0.6 on 2024-06-12 10:41
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_INDEXES = [
+    ('core_event_search_vector_gin', 'core_event', 'USING gin (search_vector)'),
+    ('core_event_name_trgm', 'core_event', 'USING gin (name gin_trgm_ops)'),
+    ('core_stadium_search_vector_gin', 'core_stadium', 'USING gin (search_vector)'),
+    ('core_stadium_name_trgm', 'core_stadium', 'USING gin (name gin_trgm_ops)'),
+    ('core_stadium_address_trgm', 'core_stadium', 'USING gin (address gin_trgm_ops)'),
+    ('core_user_login_trgm', 'core_user', 'USING gin (login gin_trgm_ops)'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, definition in SEARCH_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}')
+
+    schema_editor.execute(
+        "UPDATE core_event SET search_vector = "
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    )
+    schema_editor.execute(
+        "UPDATE core_stadium SET search_vector = "
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _, _ in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_purchase_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='stadium',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2024-06-14 09:12
+
+from django.db import migrations, models
+
+
+def create_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_event_period_gist ON core_event '
+        'USING gist (tstzrange(LEAST(start_date, end_date), GREATEST(start_date, end_date)))'
+    )
+
+
+def drop_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS core_event_period_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_event_search_vector_stadium_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['hall', 'start_date', 'end_date'], name='core_event_hall_id_f31b09_idx'),
+        ),
+        migrations.RunPython(create_period_index, drop_period_index),
+    ]
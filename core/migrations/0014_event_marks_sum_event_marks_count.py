@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2024-06-15 12:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum, OuterRef, Subquery, F, Case, When, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def fill_event_marks(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    Feedback = apps.get_model('core', 'Feedback')
+
+    feedbacks = Feedback.objects.filter(event=OuterRef('pk')).order_by().values('event')
+    Event.objects.update(
+        marks_sum=Coalesce(Subquery(feedbacks.annotate(total=Sum('mark')).values('total')), 0),
+        marks_count=Coalesce(Subquery(feedbacks.annotate(total=Count('id')).values('total')), 0)
+    )
+    Event.objects.update(average_mark=Case(
+        When(marks_count__gt=0, then=Cast(F('marks_sum'), models.FloatField()) / F('marks_count')),
+        default=Value(0.0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_event_core_event_hall_id_f31b09_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='marks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='marks_sum',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_event_marks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.6 on 2024-06-18 09:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_event_request_owners(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    EventRequest = apps.get_model('core', 'EventRequest')
+
+    events = Event.objects.filter(id=OuterRef('event_id'))
+    EventRequest.objects.update(
+        organizer_id=Subquery(events.values('user_id')[:1]),
+        stadium_user_id=Subquery(events.values('hall__stadium__user_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_event_marks_sum_event_marks_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventrequest',
+            name='organizer',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='eventrequest',
+            name='stadium_user',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='eventrequest',
+            index=models.Index(fields=['stadium_user', '-id'], name='core_eventr_stadium_9eb112_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventrequest',
+            index=models.Index(fields=['organizer', '-id'], name='core_eventr_organiz_a418a0_idx'),
+        ),
+        migrations.RunPython(fill_event_request_owners, migrations.RunPython.noop),
+    ]
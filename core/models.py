@@ -2,8 +2,14 @@ import uuid
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import Group, AbstractUser, PermissionsMixin
-from django.db import models
-from django.db.models import Avg
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, Sum, F, Case, When, Value, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+
+from core.pricing import get_discount_factor, invalidate_discount_factors
+from core.ratings import invalidate_rating_histograms
 
 
 class UserManager(BaseUserManager):
@@ -58,6 +64,7 @@ class Stadium(models.Model):
     description = models.CharField(max_length=200)
     photo_link = models.CharField(max_length=200, blank=True, null=True)
     contacts = models.CharField(max_length=100)
+    search_vector = SearchVectorField(null=True, editable=False)
 
 
 class Hall(models.Model):
@@ -73,9 +80,46 @@ class Purchase(models.Model):
     date = models.DateTimeField()
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='booked')
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+
+def get_average_mark(marks_sum, marks_count):
+    return Case(
+        When(GreaterThan(marks_count, 0), then=Cast(marks_sum, models.FloatField()) / marks_count),
+        default=Value(0.0)
+    )
+
+
+class EventQuerySet(models.QuerySet):
+    LISTING_FIELDS = ['id', 'name', 'start_date', 'end_date', 'photo_link', 'average_mark',
+                      'hall__id', 'hall__name', 'hall__stadium__id', 'hall__stadium__name']
+
+    def with_location(self):
+        return self.select_related('hall__stadium')
+
+    def listing(self):
+        return self.with_location().only(*self.LISTING_FIELDS)
+
+    def add_marks(self, marks_sum, marks_count):
+        new_sum = F('marks_sum') + marks_sum
+        new_count = F('marks_count') + marks_count
+        return self.update(
+            marks_sum=new_sum,
+            marks_count=new_count,
+            average_mark=get_average_mark(new_sum, new_count)
+        )
+
+    def recompute_marks(self):
+        feedbacks = Feedback.objects.filter(event=OuterRef('pk')).order_by().values('event')
+        marks_sum = Coalesce(Subquery(feedbacks.annotate(total=Sum('mark')).values('total')), 0)
+        marks_count = Coalesce(Subquery(feedbacks.annotate(total=Count('id')).values('total')), 0)
+        self.update(marks_sum=marks_sum, marks_count=marks_count)
+        return self.update(average_mark=get_average_mark(F('marks_sum'), F('marks_count')))
 
 
 class Event(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=['hall', 'start_date', 'end_date'])]
     hall = models.ForeignKey(Hall, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     start_date = models.DateTimeField()
@@ -85,11 +129,21 @@ class Event(models.Model):
     photo_link = models.CharField(max_length=200, null=True, blank=True)
     contacts = models.CharField(max_length=100)
     average_mark = models.FloatField(default=0.0)
+    marks_sum = models.IntegerField(default=0, editable=False)
+    marks_count = models.IntegerField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = EventQuerySet.as_manager()
 
-    def update_average_mark(self):
-        average = self.feedback_set.aggregate(Avg('mark'))['mark__avg']
-        self.average_mark = average if average is not None else 0
-        self.save()
+    MARK_FIELDS = ['marks_sum', 'marks_count', 'average_mark']
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name not in self.MARK_FIELDS]
+        super().save(*args, **kwargs)
 
 
 class Place(models.Model):
@@ -111,14 +165,25 @@ class EventPlace(models.Model):
 
     @property
     def discounted_price(self):
-        discounts = Promotion.objects.filter(promotionevent__event=self.event).values('discount')
-        price = self.price
-        for discount in discounts:
-            price *= (1 - discount['discount'] / 100)
-        return price
+        return self.price * get_discount_factor(self.event_id)
+
+
+class EventRequestQuerySet(models.QuerySet):
+    LISTING_FIELDS = ['id', 'status', 'event__id', 'event__name', 'event__hall__id', 'event__hall__name',
+                      'event__hall__stadium__id', 'event__hall__stadium__name']
+
+    def listing(self):
+        return self.select_related('event__hall__stadium').only(*self.LISTING_FIELDS)
+
+    def set_owner(self, field_name, user_id):
+        if user_id is None:
+            return self.filter(**{f'{field_name}__isnull': False}).update(**{field_name: None})
+        return self.exclude(**{field_name: user_id}).update(**{field_name: user_id})
 
 
 class EventRequest(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=['stadium_user', '-id']), models.Index(fields=['organizer', '-id'])]
     STATUS_CHOICES = (
         ('in_review', 'In review'),
         ('approved', 'Approved'),
@@ -126,6 +191,19 @@ class EventRequest(models.Model):
     )
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='in_review')
+    stadium_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, editable=False, db_index=False,
+                                     related_name='+')
+    organizer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, editable=False, db_index=False,
+                                  related_name='+')
+
+    objects = EventRequestQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.organizer_id, self.stadium_user_id = Event.objects.filter(id=self.event_id).values_list(
+                'user_id', 'hall__stadium__user_id'
+            ).get()
+        super().save(*args, **kwargs)
 
 
 class EventRequestPlace(models.Model):
@@ -144,13 +222,29 @@ class Feedback(models.Model):
     mark = models.IntegerField()
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.event.update_average_mark()
+        with transaction.atomic():
+            previous = self.get_stored_mark() if self.pk else None
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                Event.objects.filter(id=self.event_id).add_marks(self.mark, 1)
+            elif previous[0] != self.event_id:
+                Event.objects.filter(id=previous[0]).add_marks(-previous[1], -1)
+                Event.objects.filter(id=self.event_id).add_marks(self.mark, 1)
+            elif previous[1] != self.mark:
+                Event.objects.filter(id=self.event_id).add_marks(self.mark - previous[1], 0)
+            invalidate_rating_histograms([self.event_id] if previous is None else [self.event_id, previous[0]])
 
     def delete(self, *args, **kwargs):
-        event = self.event
-        super().delete(*args, **kwargs)
-        event.update_average_mark()
+        with transaction.atomic():
+            stored = self.get_stored_mark()
+            if stored is not None:
+                Event.objects.filter(id=stored[0]).add_marks(-stored[1], -1)
+                invalidate_rating_histograms([stored[0]])
+            return super().delete(*args, **kwargs)
+
+    def get_stored_mark(self):
+        return Feedback.objects.select_for_update().filter(pk=self.pk).values_list('event_id', 'mark').first()
 
 
 class Photo(models.Model):
@@ -168,9 +262,26 @@ class Promotion(models.Model):
     end_date = models.DateTimeField()
     discount = models.FloatField()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_discount_factors(self.promotionevent_set.values_list('event_id', flat=True))
+
+    def delete(self, *args, **kwargs):
+        event_ids = list(self.promotionevent_set.values_list('event_id', flat=True))
+        super().delete(*args, **kwargs)
+        invalidate_discount_factors(event_ids)
+
 
 class PromotionEvent(models.Model):
     class Meta:
         unique_together = (('promotion', 'event'),)
     promotion = models.ForeignKey(Promotion, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_discount_factors([self.event_id])
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        invalidate_discount_factors([self.event_id])
@@ -0,0 +1,118 @@
+import asyncio
+import atexit
+import logging
+import threading
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from ticket_sales_backend import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    def __init__(self, alias=DEFAULT_CHANNEL_LAYER):
+        self.alias = alias
+        self.lock = threading.Lock()
+        self.pending = []
+        self.flush_scheduled = False
+        self.flush_loop = None
+        self.loop = None
+        self.thread_loop = None
+        self.idle = threading.Event()
+        self.idle.set()
+
+    def bind(self, loop):
+        with self.lock:
+            self.loop = loop
+
+    def is_alive(self, loop):
+        return loop is not None and not loop.is_closed() and (loop is self.thread_loop or loop.is_running())
+
+    def get_loop(self):
+        if self.is_alive(self.loop):
+            return self.loop
+        if self.thread_loop is None or self.thread_loop.is_closed():
+            self.thread_loop = asyncio.new_event_loop()
+            threading.Thread(target=self.thread_loop.run_forever, name='outbox-dispatcher', daemon=True).start()
+        return self.thread_loop
+
+    def enqueue(self, group, message):
+        with self.lock:
+            self.pending.append((group, message))
+            if self.flush_scheduled and self.is_alive(self.flush_loop):
+                return
+            self.flush_scheduled = True
+            self.idle.clear()
+            self.flush_loop = self.get_loop()
+            loop = self.flush_loop
+
+        try:
+            loop.call_soon_threadsafe(self.schedule_flush)
+        except RuntimeError:
+            with self.lock:
+                if self.loop is loop:
+                    self.loop = None
+                self.flush_loop = self.get_loop()
+                loop = self.flush_loop
+            loop.call_soon_threadsafe(self.schedule_flush)
+
+    def drain(self, timeout=None):
+        with self.lock:
+            if self.flush_scheduled and not self.is_alive(self.flush_loop):
+                return False
+        return self.idle.wait(timeout)
+
+    def schedule_flush(self):
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        try:
+            while True:
+                with self.lock:
+                    batch, self.pending = self.pending, []
+                    if not batch:
+                        self.flush_scheduled = False
+                        self.idle.set()
+                        return
+                await self.send_batch(batch)
+        except BaseException:
+            with self.lock:
+                self.flush_scheduled = False
+                self.idle.set()
+            raise
+
+    async def send_batch(self, batch):
+        messages = {}
+        for group, message in batch:
+            messages.setdefault(group, []).append(message)
+
+        channel_layer = get_channel_layer(self.alias)
+        await asyncio.gather(*(self.send_group(channel_layer, group, group_messages)
+                               for group, group_messages in messages.items()))
+
+    async def send_group(self, channel_layer, group, messages):
+        for message in messages:
+            try:
+                await channel_layer.group_send(group, message)
+            except Exception:
+                logger.exception("Failed to send an event to group %s", group)
+
+
+dispatcher = OutboxDispatcher()
+atexit.register(dispatcher.drain, settings.OUTBOX_DRAIN_TIMEOUT)
+
+
+def bind_dispatcher():
+    dispatcher.bind(asyncio.get_running_loop())
+
+
+def publish(group, message):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        transaction.on_commit(lambda: dispatcher.enqueue(group, message))
+    else:
+        dispatcher.enqueue(group, message)
@@ -0,0 +1,116 @@
+from ticket_sales_backend import settings
+
+
+class CursorPage:
+    def __init__(self, object_list, has_next, has_previous, total_items=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.total_items = total_items
+
+    def next_cursor(self):
+        return get_cursor(self.object_list[-1]) if self.object_list else None
+
+    def previous_cursor(self):
+        return get_cursor(self.object_list[0]) if self.object_list else None
+
+
+class CursorPaginator:
+    def __init__(self, queryset, per_page, descending=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.forward_ordering = '-id' if descending else 'id'
+        self.backward_ordering = 'id' if descending else '-id'
+        self.after_lookup = 'id__lt' if descending else 'id__gt'
+        self.before_lookup = 'id__gt' if descending else 'id__lt'
+
+    def page(self, after=None, before=None, from_end=False):
+        if before is not None:
+            queryset = self.queryset.filter(**{self.before_lookup: before})
+            return self.backward_page(queryset, has_next=True)
+
+        if after is None and from_end:
+            return self.backward_page(self.queryset, has_next=False)
+
+        queryset = self.queryset
+        if after is not None:
+            queryset = queryset.filter(**{self.after_lookup: after})
+        items = list(queryset.order_by(self.forward_ordering)[:self.per_page + 1])
+        return CursorPage(items[:self.per_page], has_next=len(items) > self.per_page, has_previous=after is not None)
+
+    def backward_page(self, queryset, has_next):
+        items = list(queryset.order_by(self.backward_ordering)[:self.per_page + 1])
+        return CursorPage(items[:self.per_page][::-1], has_next=has_next, has_previous=len(items) > self.per_page)
+
+    async def apage(self, after=None, before=None, from_end=False):
+        if before is not None:
+            queryset = self.queryset.filter(**{self.before_lookup: before})
+            return await self.abackward_page(queryset, has_next=True)
+
+        if after is None and from_end:
+            return await self.abackward_page(self.queryset, has_next=False)
+
+        queryset = self.queryset
+        if after is not None:
+            queryset = queryset.filter(**{self.after_lookup: after})
+        items = [item async for item in queryset.order_by(self.forward_ordering)[:self.per_page + 1]]
+        return CursorPage(items[:self.per_page], has_next=len(items) > self.per_page, has_previous=after is not None)
+
+    async def abackward_page(self, queryset, has_next):
+        items = [item async for item in queryset.order_by(self.backward_ordering)[:self.per_page + 1]]
+        return CursorPage(items[:self.per_page][::-1], has_next=has_next, has_previous=len(items) > self.per_page)
+
+    def count(self):
+        return self.queryset.count()
+
+    async def acount(self):
+        return await self.queryset.acount()
+
+
+def get_cursor(item):
+    return item['id'] if isinstance(item, dict) else item.id
+
+
+def parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_cursor_page_size(value):
+    page_size = parse_cursor(value)
+    if page_size is None:
+        return settings.CURSOR_PAGE_SIZE
+    return min(max(page_size, 1), settings.CURSOR_MAX_PAGE_SIZE)
+
+
+def is_cursor_pagination(request):
+    query_params = getattr(request, 'query_params', request.GET)
+    return query_params.get('pagination') == 'cursor'
+
+
+def get_cursor_page(queryset, query_params, per_page, descending=False):
+    per_page = get_cursor_page_size(per_page)
+    paginator = CursorPaginator(queryset, per_page, descending)
+    page = paginator.page(
+        after=parse_cursor(query_params.get('after_id')),
+        before=parse_cursor(query_params.get('before_id')),
+        from_end=query_params.get('from_end') == 'true'
+    )
+    if query_params.get('with_total') == 'true':
+        page.total_items = paginator.count()
+    return page
+
+
+async def aget_cursor_page(queryset, query_params, per_page, descending=False):
+    per_page = get_cursor_page_size(per_page)
+    paginator = CursorPaginator(queryset, per_page, descending)
+    page = await paginator.apage(
+        after=parse_cursor(query_params.get('after_id')),
+        before=parse_cursor(query_params.get('before_id')),
+        from_end=query_params.get('from_end') == 'true'
+    )
+    if query_params.get('with_total') == 'true':
+        page.total_items = await paginator.acount()
+    return page
@@ -1,147 +1,194 @@
+from collections import Counter
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
 from rest_framework.permissions import BasePermission
 
 from core.models import EventRequest
+from ticket_sales_backend import settings
 
-class CanAddStadium(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_stadium')
+USER_PERMISSIONS_VERSION_KEY = 'user_permissions_version'
 
+permission_cache_stats = Counter()
 
-class CanChangeStadium(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('change_stadium')
 
+def get_user_permissions_key(user_id):
+    version = cache.get_or_set(USER_PERMISSIONS_VERSION_KEY, 0, None)
+    return f'user_permissions_{version}_{user_id}'
 
-class CanDeleteStadium(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_stadium')
 
+def load_user_permissions(user_id):
+    permissions = Permission.objects.filter(
+        Q(user__id=user_id) | Q(group__user__id=user_id)
+    ).values_list('content_type__app_label', 'codename').distinct()
+    return frozenset(f'{app_label}.{codename}' for app_label, codename in permissions)
 
-class CanAddHall(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_hall')
 
+def get_user_permissions(user):
+    permissions = getattr(user, '_cached_permissions', None)
+    if permissions is not None:
+        permission_cache_stats['hits'] += 1
+        return permissions
 
-class CanChangeHall(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('change_hall')
+    key = get_user_permissions_key(user.pk)
+    permissions = cache.get(key)
+    if permissions is None:
+        permission_cache_stats['misses'] += 1
+        permissions = load_user_permissions(user.pk)
+        cache.set(key, permissions, settings.USER_PERMISSIONS_CACHE_TIMEOUT)
+    else:
+        permission_cache_stats['hits'] += 1
 
+    user._cached_permissions = permissions
+    return permissions
 
-class CanDeleteHall(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_hall')
 
+def has_cached_perm(user, permission):
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return permission in get_user_permissions(user)
 
-class CanAddPlace(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_place')
 
+def get_permission_cache_stats():
+    return {'hits': permission_cache_stats['hits'], 'misses': permission_cache_stats['misses']}
 
-class CanChangePlace(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('change_place')
 
+def invalidate_user_permissions():
+    def invalidate():
+        try:
+            cache.incr(USER_PERMISSIONS_VERSION_KEY)
+        except ValueError:
+            cache.set(USER_PERMISSIONS_VERSION_KEY, 1, None)
+
+    transaction.on_commit(invalidate)
 
-class CanDeletePlace(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_place')
 
+class CachedPermission(BasePermission):
+    permission = None
 
-class CanAddEvent(BasePermission):
     def has_permission(self, request, view):
-        return request.user.has_perm('add_event')
+        return has_cached_perm(request.user, self.permission)
 
 
-class CanChangeEvent(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('change_event')
+class CanAddStadium(CachedPermission):
+    permission = 'add_stadium'
 
 
-class CanDeleteEvent(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_event')
+class CanChangeStadium(CachedPermission):
+    permission = 'change_stadium'
 
 
-class CanViewEventRequest(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('view_eventrequest')
+class CanDeleteStadium(CachedPermission):
+    permission = 'delete_stadium'
 
 
-class CanAddEventRequest(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_eventrequest')
+class CanAddHall(CachedPermission):
+    permission = 'add_hall'
 
 
-class CanChangeEventRequest(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('change_eventrequest')
+class CanChangeHall(CachedPermission):
+    permission = 'change_hall'
 
 
-class CanDeleteEventRequest(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_eventrequest')
+class CanDeleteHall(CachedPermission):
+    permission = 'delete_hall'
 
 
-class CanAddEventRequestPlace(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_eventrequestplace')
+class CanAddPlace(CachedPermission):
+    permission = 'add_place'
 
 
-class CanDeleteEventRequestPlace(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_eventrequestplace')
+class CanChangePlace(CachedPermission):
+    permission = 'change_place'
 
 
-class CanAddPhoto(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_photo')
+class CanDeletePlace(CachedPermission):
+    permission = 'delete_place'
 
 
-class CanDeletePhoto(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_photo')
+class CanAddEvent(CachedPermission):
+    permission = 'add_event'
 
 
-class CanAddVideo(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_video')
+class CanChangeEvent(CachedPermission):
+    permission = 'change_event'
 
 
-class CanDeleteVideo(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_video')
+class CanDeleteEvent(CachedPermission):
+    permission = 'delete_event'
 
 
-class CanAddPromotion(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_promotion')
+class CanViewEventRequest(CachedPermission):
+    permission = 'view_eventrequest'
 
 
-class CanChangePromotion(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('change_promotion')
+class CanAddEventRequest(CachedPermission):
+    permission = 'add_eventrequest'
 
 
-class CanDeletePromotion(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_promotion')
+class CanChangeEventRequest(CachedPermission):
+    permission = 'change_eventrequest'
 
 
-class CanAddPromotionEvent(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('add_promotionevent')
+class CanDeleteEventRequest(CachedPermission):
+    permission = 'delete_eventrequest'
 
 
-class CanDeletePromotionEvent(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.has_perm('delete_promotionevent')
+class CanAddEventRequestPlace(CachedPermission):
+    permission = 'add_eventrequestplace'
+
+
+class CanDeleteEventRequestPlace(CachedPermission):
+    permission = 'delete_eventrequestplace'
+
+
+class CanAddPhoto(CachedPermission):
+    permission = 'add_photo'
+
+
+class CanDeletePhoto(CachedPermission):
+    permission = 'delete_photo'
+
+
+class CanAddVideo(CachedPermission):
+    permission = 'add_video'
+
+
+class CanDeleteVideo(CachedPermission):
+    permission = 'delete_video'
+
+
+class CanAddPromotion(CachedPermission):
+    permission = 'add_promotion'
+
+
+class CanChangePromotion(CachedPermission):
+    permission = 'change_promotion'
+
+
+class CanDeletePromotion(CachedPermission):
+    permission = 'delete_promotion'
+
+
+class CanAddPromotionEvent(CachedPermission):
+    permission = 'add_promotionevent'
+
+
+class CanDeletePromotionEvent(CachedPermission):
+    permission = 'delete_promotionevent'
 
 
 class CanApproveEventRequest(BasePermission):
     def has_permission(self, request, view):
-        try:
-            event_request = EventRequest.objects.get(id=request.data['id'])
-            stadium_admin = event_request.event.hall.stadium.user
-            return request.user == stadium_admin or request.user.is_superuser
-        except EventRequest.DoesNotExist:
+        stadium_admin_ids = list(
+            EventRequest.objects.filter(id=request.data['id']).values_list('event__hall__stadium__user_id', flat=True)
+        )
+        if not stadium_admin_ids:
             return False
+        return request.user.is_authenticated and (
+            request.user.pk == stadium_admin_ids[0] or request.user.is_superuser
+        )
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ticket_sales_backend import settings
+
+
+def get_discount_factor_key(event_id):
+    return f'event_discount_factor_{event_id}'
+
+
+def get_discount_factor(event_id):
+    return get_discount_factors([event_id])[event_id]
+
+
+def get_discount_factors(event_ids):
+    event_ids = set(event_ids)
+    keys = {get_discount_factor_key(event_id): event_id for event_id in event_ids}
+    cached = cache.get_many(keys.keys())
+    factors = {keys[key]: factor for key, factor in cached.items()}
+
+    missing_ids = event_ids - factors.keys()
+    if missing_ids:
+        computed = compute_discount_factors(missing_ids)
+        for event_id, (factor, timeout) in computed.items():
+            cache.set(get_discount_factor_key(event_id), factor, timeout)
+            factors[event_id] = factor
+
+    return factors
+
+
+def compute_discount_factors(event_ids):
+    from core.models import PromotionEvent
+
+    now = timezone.now()
+    max_timeout = settings.DISCOUNT_FACTOR_CACHE_TIMEOUT
+    result = {event_id: [1.0, max_timeout] for event_id in event_ids}
+
+    promotions = PromotionEvent.objects.filter(
+        event_id__in=event_ids,
+        promotion__end_date__gt=now
+    ).values_list('event_id', 'promotion__start_date', 'promotion__end_date', 'promotion__discount')
+
+    for event_id, start_date, end_date, discount in promotions:
+        if start_date <= now:
+            result[event_id][0] *= 1 - discount / 100
+            next_change = end_date
+        else:
+            next_change = start_date
+        seconds_to_change = int((next_change - now).total_seconds()) + 1
+        result[event_id][1] = min(result[event_id][1], seconds_to_change)
+
+    return {event_id: (factor, timeout) for event_id, (factor, timeout) in result.items()}
+
+
+def invalidate_discount_factors(event_ids):
+    keys = [get_discount_factor_key(event_id) for event_id in set(event_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
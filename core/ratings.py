@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from ticket_sales_backend import settings
+
+
+def get_rating_histogram_key(event_id):
+    return f'event_rating_histogram_{event_id}'
+
+
+def get_rating_histogram(event_id):
+    key = get_rating_histogram_key(event_id)
+    histogram = cache.get(key)
+    if histogram is None:
+        histogram = build_rating_histogram(event_id)
+        cache.set(key, histogram, settings.RATING_HISTOGRAM_CACHE_TIMEOUT)
+    return histogram
+
+
+def build_rating_histogram(event_id):
+    from core.models import Event, Feedback
+
+    average_mark, marks_count = Event.objects.filter(id=event_id).values_list('average_mark', 'marks_count').get()
+    marks = Feedback.objects.filter(event_id=event_id).order_by('mark').values('mark').annotate(count=Count('id'))
+    return {
+        'average_mark': average_mark,
+        'marks_count': marks_count,
+        'histogram': {item['mark']: item['count'] for item in marks},
+    }
+
+
+def invalidate_rating_histograms(event_ids):
+    keys = [get_rating_histogram_key(event_id) for event_id in set(event_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
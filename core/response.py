@@ -1,4 +1,14 @@
+import json
+
+import orjson
+from asgiref.sync import sync_to_async
 from django.core.paginator import Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import HttpResponse
+
+from core.pagination import CursorPage
+from ticket_sales_backend import settings
 
 
 class Response:
@@ -37,3 +47,78 @@ class PageResponse:
             "has_next": self.has_next,
             "has_previous": self.has_previous
         }
+
+
+class CursorPageResponse:
+    def __init__(self, model, message, page: CursorPage, errors=None):
+        self.model = model
+        self.message = message
+        self.errors = errors
+        self.next_cursor = page.next_cursor()
+        self.previous_cursor = page.previous_cursor()
+        self.total_items = page.total_items
+        self.has_next = page.has_next
+        self.has_previous = page.has_previous
+
+    def to_dict(self):
+        return {
+            "model": self.model,
+            "message": self.message,
+            "errors": self.errors,
+            "next_cursor": self.next_cursor,
+            "previous_cursor": self.previous_cursor,
+            "total_items": self.total_items,
+            "has_next": self.has_next,
+            "has_previous": self.has_previous
+        }
+
+
+class StreamingResponse:
+    def __init__(self, model, message, serializer_class=None, context=None, chunk_size=None):
+        self.model = model
+        self.message = message
+        self.serializer_class = serializer_class
+        self.context = context or {}
+        self.chunk_size = chunk_size or settings.STREAMING_RESPONSE_CHUNK_SIZE
+
+    def serialize(self, chunk):
+        if self.serializer_class is None:
+            return chunk
+        return self.serializer_class(chunk, many=True, context=self.context).data
+
+    async def get_items(self):
+        if isinstance(self.model, QuerySet):
+            async for item in self.model.aiterator(chunk_size=self.chunk_size):
+                yield item
+        else:
+            for item in self.model:
+                yield item
+
+    async def get_chunks(self):
+        chunk = []
+        async for item in self.get_items():
+            chunk.append(item)
+            if len(chunk) == self.chunk_size:
+                yield await sync_to_async(self.serialize)(chunk)
+                chunk = []
+        if chunk:
+            yield await sync_to_async(self.serialize)(chunk)
+
+    async def to_stream(self):
+        yield '{"model": ['
+        separator = ''
+        async for chunk in self.get_chunks():
+            yield separator + ', '.join(json.dumps(item, cls=DjangoJSONEncoder) for item in chunk)
+            separator = ', '
+        yield f'], "message": {json.dumps(self.message)}, "errors": null}}'
+
+
+def is_streaming_response(request):
+    query_params = getattr(request, 'query_params', request.GET)
+    return query_params.get('stream') == 'true'
+
+
+class FastJsonResponse(HttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), **kwargs)
@@ -0,0 +1,147 @@
+from operator import itemgetter
+
+from django.utils import timezone
+
+from core.pricing import get_discount_factors
+from ticket_sales_backend import settings
+
+
+def format_datetime(value):
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class RowSerializer:
+    fields = {}
+    datetime_fields = []
+    values = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.value_names = list(cls.values)
+        cls.accessors = [(key, cls.compile_field(key, source)) for key, source in cls.fields.items()]
+
+    @classmethod
+    def compile_field(cls, key, source):
+        if source is None:
+            method_name = f'get_{key}'
+            return lambda serializer, row: getattr(serializer, method_name)(row)
+
+        if isinstance(source, dict):
+            accessors = [(nested_key, cls.compile_field(nested_key, nested)) for nested_key, nested in source.items()]
+            return lambda serializer, row: {name: accessor(serializer, row) for name, accessor in accessors}
+
+        if source not in cls.value_names:
+            cls.value_names.append(source)
+        getter = itemgetter(source)
+        if source in cls.datetime_fields:
+            return lambda serializer, row: format_datetime(getter(row))
+        return lambda serializer, row: getter(row)
+
+    @classmethod
+    def project(cls, queryset):
+        return queryset.values(*cls.value_names)
+
+    def __init__(self, rows, many=True, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    def prepare(self, rows):
+        pass
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        self.prepare(rows)
+        accessors = self.accessors
+        return [{key: accessor(self, row) for key, accessor in accessors} for row in rows]
+
+
+class EventPlaceRowSerializer(RowSerializer):
+    fields = {
+        'id': 'id',
+        'place': {
+            'id': 'place__id',
+            'sector': 'place__sector',
+            'row': 'place__row',
+            'seat': 'place__seat',
+            'x_offset': 'place__x_offset',
+            'y_offset': 'place__y_offset',
+            'hall': 'place__hall_id',
+        },
+        'discounted_price': None,
+        'purchase': None,
+    }
+    values = ['event_id', 'price', 'purchase__id', 'purchase__date', 'purchase__status']
+
+    def prepare(self, rows):
+        self.discount_factors = get_discount_factors({row['event_id'] for row in rows})
+
+    def get_discounted_price(self, row):
+        return row['price'] * self.discount_factors[row['event_id']]
+
+    def get_purchase(self, row):
+        if row['purchase__id'] is None:
+            return {'date': None, 'status': None}
+        return {
+            'id': row['purchase__id'],
+            'date': format_datetime(row['purchase__date']),
+            'status': row['purchase__status'],
+        }
+
+
+class FeedbackRowSerializer(RowSerializer):
+    fields = {
+        'id': 'id',
+        'text': 'text',
+        'date': 'date',
+        'mark': 'mark',
+        'user': {'id': 'user__id', 'name': 'user__login'},
+    }
+    datetime_fields = ['date']
+
+
+class ChatMessageRowSerializer(RowSerializer):
+    fields = {
+        'id': 'id',
+        'text': 'text',
+        'date': 'date',
+        'info': {
+            'sender_id': 'chat_member__user__id',
+            'sender_name': 'chat_member__user__login',
+            'chat_id': 'chat_member__chat_id',
+        },
+    }
+    datetime_fields = ['date']
+
+
+class EventRowSerializer(RowSerializer):
+    fields = {
+        'id': 'id',
+        'hall': {'id': 'hall__id', 'name': 'hall__name'},
+        'stadium': {'id': 'hall__stadium__id', 'name': 'hall__stadium__name'},
+        'photo_link': None,
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+        'name': 'name',
+        'description': 'description',
+        'contacts': 'contacts',
+        'average_mark': 'average_mark',
+        'user': 'user_id',
+    }
+    datetime_fields = ['start_date', 'end_date']
+    values = ['photo_link']
+
+    def prepare(self, rows):
+        self.photo_prefix = (f"{self.context['request'].build_absolute_uri('/')}{settings.MEDIA_URL[1::]}"
+                             f"{settings.MEDIA_FOLDERS['event']}/")
+
+    def get_photo_link(self, row):
+        return f"{self.photo_prefix}{row['photo_link']}" if row['photo_link'] else None
+
+
+class EventShortRowSerializer(EventRowSerializer):
+    fields = {key: EventRowSerializer.fields[key] for key in
+              ['id', 'name', 'start_date', 'end_date', 'photo_link', 'average_mark', 'hall', 'stadium']}
@@ -0,0 +1,69 @@
+from bisect import bisect_right
+
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Func
+from django.db.models.functions import Greatest, Least
+
+from core.models import Event
+
+
+class TsTzRange(Func):
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
+def is_range_index_available():
+    return connection.vendor == 'postgresql'
+
+
+def get_hall_events(hall_id, start, end, exclude_event_id=None):
+    events = Event.objects.filter(hall_id=hall_id)
+    if is_range_index_available():
+        events = events.annotate(
+            period=TsTzRange(Least('start_date', 'end_date'), Greatest('start_date', 'end_date'))
+        ).filter(period__overlap=DateTimeTZRange(start, end))
+    else:
+        events = events.filter(start_date__lt=end, end_date__gt=start)
+
+    if exclude_event_id is not None:
+        events = events.exclude(id=exclude_event_id)
+    return events
+
+
+def is_hall_free(hall_id, start, end, exclude_event_id=None):
+    return not get_hall_events(hall_id, start, end, exclude_event_id).exists()
+
+
+def get_hall_schedule(hall_id, start, end):
+    intervals = get_hall_events(hall_id, start, end).values_list('start_date', 'end_date')
+    return HallSchedule((min(interval), max(interval)) for interval in intervals)
+
+
+class HallSchedule:
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def free_slots(self, start, end, min_duration=None):
+        slots = []
+        slot_start = start
+        for index in range(max(bisect_right(self.starts, start) - 1, 0), len(self.starts)):
+            if self.starts[index] >= end:
+                break
+            if self.starts[index] > slot_start:
+                slots.append((slot_start, self.starts[index]))
+            slot_start = max(slot_start, self.ends[index])
+        if slot_start < end:
+            slots.append((slot_start, end))
+
+        if min_duration is not None:
+            slots = [(slot_start, slot_end) for slot_start, slot_end in slots if slot_end - slot_start >= min_duration]
+        return slots
@@ -0,0 +1,111 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, When, Value, F, Q
+from django.db.models.functions import Greatest
+
+from ticket_sales_backend import settings
+
+SEARCH_CONFIG = 'simple'
+
+EVENT_SEARCH_FIELDS = (('name', 'A'), ('description', 'B'))
+
+STADIUM_SEARCH_FIELDS = (('name', 'A'), ('description', 'B'))
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def is_search_engine_available():
+    return connection.vendor == 'postgresql'
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+def get_search_vector(weighted_fields):
+    vector = None
+    for field, weight in weighted_fields:
+        field_vector = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = field_vector if vector is None else vector + field_vector
+    return vector
+
+
+def update_search_vector(instance, weighted_fields):
+    if is_search_engine_available():
+        type(instance).objects.filter(pk=instance.pk).update(search_vector=get_search_vector(weighted_fields))
+
+
+def get_prefix_query(query):
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    raw_query = ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+    return SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+
+
+def get_contains_condition(query, fields):
+    condition = Q()
+    for token in tokenize(query) or [query]:
+        token_condition = Q()
+        for field in fields:
+            token_condition |= Q(**{f'{field}__icontains': token})
+        condition &= token_condition
+    return condition
+
+
+def search(queryset, query, fields, vector_field=None, order=True):
+    if not query:
+        return queryset
+
+    if not is_search_engine_available():
+        queryset = queryset.filter(get_contains_condition(query, fields))
+        if order:
+            phrase_condition = Q()
+            for field in fields:
+                phrase_condition |= Q(**{f'{field}__icontains': query})
+            rank = Case(When(phrase_condition, then=Value(1)), default=Value(0))
+            queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', 'pk')
+        return queryset
+
+    condition = Q()
+    similarities = []
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query}) | Q(**{f'{field}__trigram_similar': query})
+        similarities.append(TrigramSimilarity(field, query))
+    rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+
+    if vector_field:
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        condition |= Q(**{vector_field: search_query})
+        rank = rank + SearchRank(F(vector_field), search_query)
+
+    queryset = queryset.filter(condition)
+    if order:
+        queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', 'pk')
+    return queryset
+
+
+def autocomplete(queryset, prefix, field, vector_field=None, limit=None):
+    limit = limit or settings.SEARCH_AUTOCOMPLETE_LIMIT
+    if not prefix:
+        return []
+
+    starts_with = Case(When(**{f'{field}__istartswith': prefix}, then=Value(1)), default=Value(0))
+    if not is_search_engine_available():
+        suggestions = queryset.filter(get_contains_condition(prefix, [field])).annotate(
+            starts_with=starts_with
+        ).order_by('-starts_with', 'pk').values_list('pk', field)[:limit]
+        return [{'id': pk, 'value': value} for pk, value in suggestions]
+
+    condition = Q(**{f'{field}__istartswith': prefix})
+    prefix_query = get_prefix_query(prefix)
+    if vector_field and prefix_query is not None:
+        condition |= Q(**{vector_field: prefix_query})
+
+    suggestions = queryset.filter(condition).annotate(
+        starts_with=starts_with,
+        similarity=TrigramSimilarity(field, prefix)
+    ).order_by('-starts_with', '-similarity', 'pk').values_list('pk', field)[:limit]
+    return [{'id': pk, 'value': value} for pk, value in suggestions]
@@ -0,0 +1,109 @@
+import struct
+import sys
+from array import array
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.models import EventPlace
+from core.pricing import get_discount_factor
+from core.websockets import send_places_update
+from ticket_sales_backend import settings
+
+SEAT_MAP_MAGIC = b'SMAP'
+SEAT_MAP_VERSION = 1
+SEAT_MAP_HEADER = struct.Struct('<4sHI')
+
+SEAT_MAP_COLUMNS = (
+    ('ids', 'q'),
+    ('sectors', 'i'),
+    ('rows', 'i'),
+    ('seats', 'i'),
+    ('x_offsets', 'd'),
+    ('y_offsets', 'd'),
+    ('prices', 'd'),
+    ('available', 'B'),
+)
+
+
+def get_seat_map_version_key(event_id):
+    return f'event_seat_map_version_{event_id}'
+
+
+def build_seat_map_layout(event_id):
+    layout = {name: [] for name, _ in SEAT_MAP_COLUMNS if name != 'available'}
+    rows = EventPlace.objects.filter(event_id=event_id).order_by('id').values_list(
+        'id', 'place__sector', 'place__row', 'place__seat', 'place__x_offset', 'place__y_offset', 'price'
+    )
+    for event_place_id, sector, row, seat, x_offset, y_offset, price in rows:
+        layout['ids'].append(event_place_id)
+        layout['sectors'].append(sector)
+        layout['rows'].append(row)
+        layout['seats'].append(seat)
+        layout['x_offsets'].append(x_offset)
+        layout['y_offsets'].append(y_offset)
+        layout['prices'].append(price)
+    return layout
+
+
+def get_seat_map_layout(event_id):
+    version = cache.get_or_set(get_seat_map_version_key(event_id), 0, None)
+    key = f'event_seat_map_{event_id}_{version}'
+    layout = cache.get(key)
+    if layout is None:
+        layout = build_seat_map_layout(event_id)
+        cache.set(key, layout, settings.SEAT_MAP_CACHE_TIMEOUT)
+    return layout
+
+
+def get_taken_place_ids(event_id):
+    return set(EventPlace.objects.filter(event_id=event_id, purchase__isnull=False).values_list('id', flat=True))
+
+
+def get_seat_map(event_id):
+    layout = get_seat_map_layout(event_id)
+    taken_ids = get_taken_place_ids(event_id)
+    discount_factor = get_discount_factor(event_id)
+    return {
+        **layout,
+        'prices': [price * discount_factor for price in layout['prices']],
+        'available': [0 if event_place_id in taken_ids else 1 for event_place_id in layout['ids']],
+    }
+
+
+def pack_seat_map(seat_map):
+    chunks = [SEAT_MAP_HEADER.pack(SEAT_MAP_MAGIC, SEAT_MAP_VERSION, len(seat_map['ids']))]
+    for name, typecode in SEAT_MAP_COLUMNS:
+        column = array(typecode, seat_map[name])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        chunks.append(column.tobytes())
+    return b''.join(chunks)
+
+
+def bump_seat_map_versions(event_ids):
+    for event_id in event_ids:
+        key = get_seat_map_version_key(event_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def set_places_availability(event_places, available):
+    event_place_ids = {}
+    for event_place_id, event_id in event_places:
+        event_place_ids.setdefault(event_id, []).append(event_place_id)
+
+    def update():
+        for event_id, ids in event_place_ids.items():
+            send_places_update(event_id, ids, available)
+
+    if event_place_ids:
+        transaction.on_commit(update)
+
+
+def invalidate_seat_maps(event_ids):
+    event_ids = set(event_ids)
+    if event_ids:
+        transaction.on_commit(lambda: bump_seat_map_versions(event_ids))
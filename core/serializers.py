@@ -1,8 +1,14 @@
 from django.contrib.auth.models import Group
+from django.db import models
 from rest_framework import serializers
 
 from core.models import City, User, UserGroupRequest, Stadium, Hall, Place, Event, Promotion, PromotionEvent, Feedback, \
     Photo, Video, EventRequest, EventRequestPlace, EventPlace, Purchase
+from core.layouts import iter_bulk_create_places, bulk_update_places, count_layout_places, create_layout_places, \
+    bulk_create_event_request_places, materialize_event_places
+from core.pricing import get_discount_factors
+from core.scheduling import is_hall_free
+from core.seat_map import invalidate_seat_maps
 from ticket_sales_backend import settings
 
 
@@ -56,13 +62,72 @@ class PlaceGetSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class PlaceListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        hall_ids = {place_data['hall_id'] for place_data in attrs}
+        if len(hall_ids) != Hall.objects.filter(id__in=hall_ids).count():
+            raise serializers.ValidationError("Hall was not found")
+        return attrs
+
+    def create(self, validated_data):
+        return [place for batch in iter_bulk_create_places(validated_data) for place in batch]
+
+    def update(self, instance, validated_data):
+        return bulk_update_places(instance, validated_data)
+
+
 class PlaceSerializer(serializers.ModelSerializer):
-    hall_id = serializers.PrimaryKeyRelatedField(source='hall', queryset=Hall.objects.all())
-    hall_id.default_error_messages['does_not_exist'] = 'Hall was not found'
+    hall_id = serializers.IntegerField()
 
     class Meta:
         model = Place
         fields = ['id', 'sector', 'row', 'seat', 'x_offset', 'y_offset', 'hall_id']
+        list_serializer_class = PlaceListSerializer
+
+    def validate_hall_id(self, value):
+        if self.parent is None and not Hall.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Hall was not found")
+        return value
+
+
+class SectorLayoutSerializer(serializers.Serializer):
+    sector = serializers.IntegerField()
+    rows = serializers.IntegerField(min_value=1)
+    seats_per_row = serializers.IntegerField(min_value=1)
+    seats_increment = serializers.IntegerField(default=0)
+    first_row = serializers.IntegerField(default=1)
+    first_seat = serializers.IntegerField(default=1)
+    origin_x = serializers.FloatField(default=0)
+    origin_y = serializers.FloatField(default=0)
+    seat_spacing = serializers.FloatField(default=1)
+    row_spacing = serializers.FloatField(default=1)
+    curvature = serializers.FloatField(default=0)
+
+    def validate(self, data):
+        if data['seats_per_row'] + (data['rows'] - 1) * data['seats_increment'] < 1:
+            raise serializers.ValidationError("Every row of the sector should have at least one seat")
+        return data
+
+
+class PlaceLayoutSerializer(serializers.Serializer):
+    hall_id = serializers.IntegerField()
+    sectors = SectorLayoutSerializer(many=True, allow_empty=False)
+
+    def validate_hall_id(self, value):
+        if not Hall.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Hall was not found")
+        return value
+
+    def validate_sectors(self, value):
+        sectors = [sector['sector'] for sector in value]
+        if len(sectors) != len(set(sectors)):
+            raise serializers.ValidationError("Sectors should not be repeated")
+        if count_layout_places(value) > settings.MAX_GENERATED_PLACES:
+            raise serializers.ValidationError(f"Layout can't contain more than {settings.MAX_GENERATED_PLACES} places")
+        return value
+
+    def create(self, validated_data):
+        return create_layout_places(validated_data['hall_id'], validated_data['sectors'])
 
 
 class EventListSerializer(serializers.ModelSerializer):
@@ -72,7 +137,8 @@ class EventListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = '__all__'
+        fields = ['id', 'hall', 'stadium', 'photo_link', 'start_date', 'end_date', 'name', 'description', 'contacts',
+                  'average_mark', 'user']
 
     def get_hall(self, obj: Event):
         return {
@@ -91,6 +157,12 @@ class EventListSerializer(serializers.ModelSerializer):
                 f'{settings.MEDIA_FOLDERS['event']}/{obj.photo_link}') if obj.photo_link else None
 
 
+class EventShortListSerializer(EventListSerializer):
+    class Meta:
+        model = Event
+        fields = ['id', 'name', 'start_date', 'end_date', 'photo_link', 'average_mark', 'hall', 'stadium']
+
+
 class EventGetSerializer(serializers.ModelSerializer):
     hall = serializers.SerializerMethodField()
     stadium = serializers.SerializerMethodField()
@@ -120,6 +192,13 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = ['id', 'start_date', 'end_date', 'name', 'description', 'contacts', 'hall_id']
 
+    def validate(self, data):
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date is not None and end_date is not None and end_date <= start_date:
+            raise serializers.ValidationError("Event should end after it starts")
+        return data
+
 
 class EventPhotoSerializer(serializers.ModelSerializer):
     event_id = serializers.PrimaryKeyRelatedField(source='event', queryset=Event.objects.all())
@@ -139,22 +218,49 @@ class EventVideoSerializer(serializers.ModelSerializer):
         fields = ['id', 'link', 'event_id']
 
 
+class EventRequestPlaceListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        place_ids = {place_data['place_id'] for place_data in attrs}
+        if len(place_ids) != len(attrs):
+            raise serializers.ValidationError("Places should not be repeated")
+        if len(place_ids) != Place.objects.filter(id__in=place_ids).count():
+            raise serializers.ValidationError("Place was not found")
+        return attrs
+
+
 class EventRequestPlaceSerializer(serializers.ModelSerializer):
-    place_id = serializers.PrimaryKeyRelatedField(source='place', queryset=Place.objects.all())
-    place_id.default_error_messages['does_not_exist'] = 'Place was not found'
+    place_id = serializers.IntegerField()
 
     class Meta:
         model = EventRequestPlace
         fields = ['place_id', 'price']
+        list_serializer_class = EventRequestPlaceListSerializer
+
+
+class EventPlaceListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        event_places = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context['discount_factors'] = get_discount_factors({obj.event_id for obj in event_places})
+        return super().to_representation(event_places)
 
 
-class EventPlaceGetSerializer(serializers.ModelSerializer):
+class DiscountedPriceMixin:
+    def get_discounted_price(self, obj: EventPlace):
+        discount_factors = self.context.get('discount_factors', {})
+        if obj.event_id in discount_factors:
+            return obj.price * discount_factors[obj.event_id]
+        return obj.discounted_price
+
+
+class EventPlaceGetSerializer(DiscountedPriceMixin, serializers.ModelSerializer):
     purchase = serializers.SerializerMethodField()
     place = serializers.SerializerMethodField()
+    discounted_price = serializers.SerializerMethodField()
 
     class Meta:
         model = EventPlace
         fields = ['id', 'place', 'discounted_price', 'purchase']
+        list_serializer_class = EventPlaceListSerializer
 
     def get_place(self, obj: EventPlace):
         return PlaceGetSerializer(obj.place).data
@@ -163,13 +269,15 @@ class EventPlaceGetSerializer(serializers.ModelSerializer):
         return PurchaseGetSerializer(obj.purchase).data
 
 
-class EventPlaceDetailsSerializer(serializers.ModelSerializer):
+class EventPlaceDetailsSerializer(DiscountedPriceMixin, serializers.ModelSerializer):
     place = serializers.SerializerMethodField()
     event = serializers.SerializerMethodField()
+    discounted_price = serializers.SerializerMethodField()
 
     class Meta:
         model = EventPlace
         fields = ['id', 'place', 'discounted_price', 'event']
+        list_serializer_class = EventPlaceListSerializer
 
     def get_place(self, obj: EventPlace):
         return PlaceGetSerializer(obj.place).data
@@ -192,7 +300,7 @@ class PurchaseDetailsSerializer(serializers.ModelSerializer):
         fields = ['id', 'date', 'status', 'places']
 
     def get_places(self, obj: Purchase):
-        places = EventPlace.objects.filter(purchase=obj)
+        places = EventPlace.objects.filter(purchase=obj).select_related('place', 'event__hall__stadium')
         return EventPlaceDetailsSerializer(places, many=True).data
 
 
@@ -218,17 +326,8 @@ class EventRequestCreateSerializer(serializers.ModelSerializer):
         fields = ['event_id', 'places']
 
     def validate(self, data):
-        event = Event.objects.get(id=data['event_id'])
-        coincide_dates_events = Event.objects.filter(
-            hall=event.hall,
-            start_date__lt=event.start_date,
-            end_date__gt=event.start_date
-        ) | Event.objects.filter(
-            hall=event.hall,
-            start_date__lt=event.end_date,
-            end_date__gt=event.end_date
-        )
-        if coincide_dates_events.exists():
+        event = data['event']
+        if not is_hall_free(event.hall_id, event.start_date, event.end_date, exclude_event_id=event.id):
             raise serializers.ValidationError("You can't approve request for this event, because another event will "
                                               "take place in this dates and in this hall")
         return data
@@ -236,9 +335,7 @@ class EventRequestCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         places_data = validated_data.pop('places')
         event_request = EventRequest.objects.create(**validated_data)
-        for place_data in places_data:
-            place_data['event_request'] = event_request
-            EventRequestPlace.objects.create(**place_data)
+        bulk_create_event_request_places(event_request.id, places_data)
         return event_request
 
 
@@ -247,22 +344,24 @@ class EventRequestUpdateSerializer(serializers.ModelSerializer):
         model = EventRequest
         fields = ['id', 'status']
 
-    def update(self, instance, validated_data):
-        previous_status = instance.status
-        if previous_status != 'in_review':
+    def validate(self, data):
+        if self.instance.status != 'in_review':
             raise serializers.ValidationError("This request has already been approved or rejected")
 
+        if data.get('status') == 'approved':
+            event = self.instance.event
+            if not is_hall_free(event.hall_id, event.start_date, event.end_date, exclude_event_id=event.id):
+                raise serializers.ValidationError("You can't approve request for this event, because another event "
+                                                  "will take place in this dates and in this hall")
+        return data
+
+    def update(self, instance, validated_data):
+        previous_status = instance.status
         instance = super().update(instance, validated_data)
 
         if previous_status != 'approved' and instance.status == 'approved':
-            event_request_places = EventRequestPlace.objects.filter(event_request_id=instance.id)
-            for request_place in event_request_places:
-                EventPlace.objects.create(
-                    event=instance.event,
-                    place=request_place.place,
-                    price=request_place.price,
-                    purchase=None
-                )
+            materialize_event_places(instance)
+            invalidate_seat_maps([instance.event_id])
 
         return instance
 
@@ -282,7 +381,7 @@ class EventRequestDetailsSerializer(serializers.ModelSerializer):
         }
 
     def get_places(self, obj: EventRequest):
-        places = EventRequestPlace.objects.filter(event_request=obj)
+        places = EventRequestPlace.objects.filter(event_request=obj).select_related('place')
         return EventRequestPlaceGetSerializer(places, many=True).data
 
 
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+
+from core.announcements import invalidate_announcements
+from core.models import Event, Hall, Stadium, EventRequest, User
+from core.permissions import invalidate_user_permissions
+from core.search import update_search_vector, EVENT_SEARCH_FIELDS, STADIUM_SEARCH_FIELDS
+
+
+@receiver(pre_save, sender=Event)
+def invalidate_previous_event_announcement(sender, instance, **kwargs):
+    if instance.pk is not None:
+        invalidate_announcements(
+            Event.objects.filter(pk=instance.pk).values_list('hall__stadium__city_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_announcement(sender, instance, **kwargs):
+    invalidate_announcements(Hall.objects.filter(id=instance.hall_id).values_list('stadium__city_id', flat=True))
+
+
+@receiver(post_save, sender=EventRequest)
+def invalidate_event_request_announcement(sender, instance, **kwargs):
+    invalidate_announcements(
+        Event.objects.filter(id=instance.event_id).values_list('hall__stadium__city_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Hall)
+@receiver(post_delete, sender=Hall)
+def invalidate_hall_announcement(sender, instance, **kwargs):
+    invalidate_announcements(Stadium.objects.filter(id=instance.stadium_id).values_list('city_id', flat=True))
+
+
+@receiver(post_save, sender=Stadium)
+@receiver(post_delete, sender=Stadium)
+def invalidate_stadium_announcement(sender, instance, **kwargs):
+    invalidate_announcements([instance.city_id])
+
+
+@receiver(post_save, sender=Event)
+def update_event_request_owners(sender, instance, created, **kwargs):
+    if created:
+        return
+    event_requests = EventRequest.objects.filter(event_id=instance.id)
+    event_requests.set_owner('organizer', instance.user_id)
+    event_requests.set_owner(
+        'stadium_user', Hall.objects.filter(id=instance.hall_id).values_list('stadium__user_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Hall)
+def update_hall_event_request_owners(sender, instance, created, **kwargs):
+    if not created:
+        EventRequest.objects.filter(event__hall_id=instance.id).set_owner(
+            'stadium_user', Stadium.objects.filter(id=instance.stadium_id).values_list('user_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Stadium)
+def update_stadium_event_request_owners(sender, instance, created, **kwargs):
+    if not created:
+        EventRequest.objects.filter(event__hall__stadium_id=instance.id).set_owner('stadium_user', instance.user_id)
+
+
+@receiver(post_save, sender=Event)
+def update_event_search_vector(sender, instance, **kwargs):
+    update_search_vector(instance, EVENT_SEARCH_FIELDS)
+
+
+@receiver(post_save, sender=Stadium)
+def update_stadium_search_vector(sender, instance, **kwargs):
+    update_search_vector(instance, STADIUM_SEARCH_FIELDS)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_user_permissions_on_m2m_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_user_permissions()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_delete, sender=Group)
+def invalidate_user_permissions_on_change(sender, **kwargs):
+    invalidate_user_permissions()
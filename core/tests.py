@@ -1,3 +1,1010 @@
-from django.test import TestCase
+import asyncio
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, Group, Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import (User, City, Stadium, Hall, Event, Place, EventPlace, Promotion, PromotionEvent, Purchase,
+                         EventRequest, EventRequestPlace, Feedback)
+from core.layouts import count_layout_places, generate_places, materialize_event_places
+from core.outbox import OutboxDispatcher, publish
+from core.permissions import (CanAddStadium, CanApproveEventRequest, has_cached_perm, get_user_permissions,
+                              get_permission_cache_stats)
+from core.response import FastJsonResponse
+from core.rows import EventPlaceRowSerializer, EventRowSerializer, EventShortRowSerializer, FeedbackRowSerializer
+from core.serializers import EventListSerializer, EventPlaceGetSerializer, EventSerializer, EventShortListSerializer, \
+    FeedbackGetSerializer
+from core.pagination import CursorPaginator, get_cursor_page_size
+from core.pricing import get_discount_factor, compute_discount_factors
+from core.scheduling import HallSchedule, get_hall_schedule, is_hall_free
+from core.search import search
+from core.seat_map import get_seat_map, invalidate_seat_maps, pack_seat_map, SEAT_MAP_HEADER
+from ticket_sales_backend import settings
+
+
+class EventListQueryCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(login='organizer', password='password')
+        self.city = City.objects.create(name='City')
+        now = timezone.now()
+        for i in range(5):
+            stadium = Stadium.objects.create(city=self.city, user=user, address=f'Address {i}', name=f'Stadium {i}',
+                                             description='Description', contacts='Contacts')
+            hall = Hall.objects.create(name=f'Hall {i}', stadium=stadium)
+            Event.objects.create(hall=hall, user=user, name=f'Event {i}', contacts='Contacts',
+                                 start_date=now + timedelta(days=i + 1), end_date=now + timedelta(days=i + 2))
+
+    def test_announcement_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/events/announcement/{self.city.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['model']), 5)
+        self.assertEqual(response.json()['model'][0]['stadium']['name'], 'Stadium 0')
+
+    def test_announcement_is_cached_until_event_changes(self):
+        self.client.get(f'/api/events/announcement/{self.city.id}')
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/events/announcement/{self.city.id}')
+
+        event = Event.objects.get(name='Event 0')
+        event.name = 'Renamed event'
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+
+        response = self.client.get(f'/api/events/announcement/{self.city.id}')
+        self.assertEqual(response.json()['model'][0]['name'], 'Renamed event')
+
+    def test_announcement_page_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/events/announcement/{self.city.id}?page_number=1&page_size=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['model']), 2)
+        self.assertEqual(response.json()['total_items'], 5)
+
+    def test_announcement_short_projection(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/events/announcement/{self.city.id}?projection=short')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.json()['model'][0].keys()),
+            {'id', 'name', 'start_date', 'end_date', 'photo_link', 'average_mark', 'hall', 'stadium'}
+        )
+
+    def test_catalog_query_count(self):
+        now = timezone.now()
+        query = {
+            'stadium_ids': list(Stadium.objects.values_list('id', flat=True)),
+            'start_date_from': now.isoformat(),
+            'start_date_to': (now + timedelta(days=30)).isoformat(),
+            'end_date_from': now.isoformat(),
+            'end_date_to': (now + timedelta(days=30)).isoformat(),
+            'page_number': 1,
+            'page_size': 10
+        }
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/events/catalog/', query)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['model']), 5)
+
+
+class EventPlacesTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(login='organizer', password='password')
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.user.is_active = True
+        self.city = City.objects.create(name='City')
+        self.stadium = Stadium.objects.create(city=self.city, user=self.user, address='Address', name='Stadium',
+                                              description='Description', contacts='Contacts')
+        self.hall = Hall.objects.create(name='Hall', stadium=self.stadium)
+        now = timezone.now()
+        self.event = Event.objects.create(hall=self.hall, user=self.user, name='Rock concert', contacts='Contacts',
+                                          start_date=now + timedelta(days=1),
+                                          end_date=now + timedelta(days=1, hours=2))
+        self.places = [Place.objects.create(hall=self.hall, sector=1, row=1, seat=i, x_offset=i, y_offset=0)
+                       for i in range(5)]
+        self.event_places = [EventPlace.objects.create(event=self.event, place=place, price=100)
+                             for place in self.places]
+
+
+class DiscountFactorTest(EventPlacesTestCase):
+    def create_promotion(self, start_delta, end_delta, discount):
+        now = timezone.now()
+        promotion = Promotion.objects.create(start_date=now + start_delta, end_date=now + end_delta, discount=discount)
+        PromotionEvent.objects.create(promotion=promotion, event=self.event)
+        return promotion
+
+    def test_only_active_promotions_are_combined(self):
+        self.create_promotion(timedelta(days=-1), timedelta(days=1), 10)
+        self.create_promotion(timedelta(days=-1), timedelta(days=1), 50)
+        self.create_promotion(timedelta(days=1), timedelta(days=2), 90)
+        self.create_promotion(timedelta(days=-2), timedelta(days=-1), 90)
+        self.assertAlmostEqual(get_discount_factor(self.event.id), 0.45)
+        self.assertAlmostEqual(self.event_places[0].discounted_price, 45)
+
+    def test_timeout_ends_at_next_promotion_change(self):
+        self.create_promotion(timedelta(hours=1), timedelta(days=2), 10)
+        factor, timeout = compute_discount_factors([self.event.id])[self.event.id]
+        self.assertEqual(factor, 1.0)
+        self.assertLessEqual(timeout, 3601)
+
+    def test_factor_is_cached(self):
+        get_discount_factor(self.event.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_discount_factor(self.event.id), 1.0)
+
+    def test_promotion_change_invalidates_factor(self):
+        promotion = self.create_promotion(timedelta(days=-1), timedelta(days=1), 10)
+        self.assertAlmostEqual(get_discount_factor(self.event.id), 0.9)
+        promotion.discount = 20
+        with self.captureOnCommitCallbacks(execute=True):
+            promotion.save()
+        self.assertAlmostEqual(get_discount_factor(self.event.id), 0.8)
+
+
+class SeatMapTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_seat_map_columns(self):
+        seat_map = get_seat_map(self.event.id)
+        self.assertEqual(seat_map['ids'], [event_place.id for event_place in self.event_places])
+        self.assertEqual(seat_map['seats'], [0, 1, 2, 3, 4])
+        self.assertEqual(seat_map['prices'], [100] * 5)
+        self.assertEqual(seat_map['available'], [1] * 5)
+
+    def test_layout_is_cached(self):
+        get_seat_map(self.event.id)
+        with self.assertNumQueries(1):
+            get_seat_map(self.event.id)
+
+    def test_purchase_and_release_keep_layout_cached(self):
+        get_seat_map(self.event.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/purchase/', {'event_place_ids': [self.event_places[1].id]},
+                                        format='json')
+        with self.assertNumQueries(1):
+            self.assertEqual(get_seat_map(self.event.id)['available'], [1, 0, 1, 1, 1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/purchase/{response.json()['model']['id']}")
+        with self.assertNumQueries(1):
+            self.assertEqual(get_seat_map(self.event.id)['available'], [1] * 5)
+
+    def test_price_change_invalidates_layout(self):
+        get_seat_map(self.event.id)
+        EventPlace.objects.filter(id=self.event_places[0].id).update(price=50)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_seat_maps([self.event.id])
+        self.assertEqual(get_seat_map(self.event.id)['prices'], [50] + [100] * 4)
+
+    def test_binary_encoding(self):
+        response = self.client.get(f'/api/events/places/map/{self.event.id}?encoding=binary')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertEqual(response.content, pack_seat_map(get_seat_map(self.event.id)))
+        self.assertEqual(SEAT_MAP_HEADER.unpack(response.content[:SEAT_MAP_HEADER.size])[2], 5)
+
+    def test_unknown_event(self):
+        response = self.client.get('/api/events/places/map/999')
+        self.assertEqual(response.status_code, 400)
+
+
+class PurchaseBookingTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, event_places):
+        return self.client.post('/api/purchase/', {'event_place_ids': [event_place.id for event_place in event_places]},
+                                format='json')
+
+    def test_book_places(self):
+        response = self.book(self.event_places[:2])
+        self.assertEqual(response.status_code, 201)
+        purchase = Purchase.objects.get()
+        self.assertEqual(EventPlace.objects.filter(purchase=purchase).count(), 2)
+
+    def test_booking_is_all_or_nothing(self):
+        self.book(self.event_places[:2])
+        response = self.client.post('/api/purchase/',
+                                    {'event_place_ids': [self.event_places[1].id, self.event_places[2].id, 999]},
+                                    format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['model']['event_place_ids'], [self.event_places[1].id, 999])
+        self.assertEqual(Purchase.objects.count(), 1)
+        self.assertIsNone(EventPlace.objects.get(id=self.event_places[2].id).purchase_id)
+
+    def test_missing_event_place_ids(self):
+        response = self.client.post('/api/purchase/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], 'Event place ids were not provided')
+
+
+class PurchaseHoldTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, event_place):
+        response = self.client.post('/api/purchase/', {'event_place_ids': [event_place.id]}, format='json')
+        return response.json()['model']['id']
+
+    def expire(self, *purchase_ids):
+        Purchase.objects.filter(id__in=purchase_ids).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_confirm_booked_purchase(self):
+        purchase_id = self.book(self.event_places[0])
+        self.assertIsNotNone(Purchase.objects.get(id=purchase_id).expires_at)
+
+        response = self.client.put('/api/purchase/', {'purchase_ids': [purchase_id]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        purchase = Purchase.objects.get(id=purchase_id)
+        self.assertEqual(purchase.status, 'purchased')
+        self.assertIsNone(purchase.expires_at)
+
+    def test_expired_hold_is_not_confirmed(self):
+        active_id = self.book(self.event_places[0])
+        expired_id = self.book(self.event_places[1])
+        self.expire(expired_id)
+
+        response = self.client.put('/api/purchase/', {'purchase_ids': [active_id, expired_id]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['model']['purchase_ids'], [expired_id])
+        self.assertEqual(Purchase.objects.get(id=active_id).status, 'booked')
+
+    def test_release_expired_holds(self):
+        purchase_ids = [self.book(event_place) for event_place in self.event_places[:3]]
+        self.expire(*purchase_ids[:2])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('release_expired_holds', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(list(Purchase.objects.values_list('id', flat=True)), purchase_ids[2:])
+        self.assertEqual(EventPlace.objects.filter(purchase__isnull=True).count(), 4)
+        self.assertEqual(get_seat_map(self.event.id)['available'], [1, 1, 0, 1, 1])
+
+
+class CursorPaginationTest(EventPlacesTestCase):
+    def get_page(self, **params):
+        response = self.client.get(f'/api/events/places/list/{self.event.id}',
+                                   {'pagination': 'cursor', 'page_size': 2, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, page):
+        return [event_place['id'] for event_place in page['model']]
+
+    def test_walk_forward_and_backward(self):
+        ids = [event_place.id for event_place in self.event_places]
+        first = self.get_page()
+        self.assertEqual(self.ids(first), ids[:2])
+        self.assertTrue(first['has_next'])
+        self.assertFalse(first['has_previous'])
+
+        second = self.get_page(after_id=first['next_cursor'])
+        self.assertEqual(self.ids(second), ids[2:4])
+
+        last = self.get_page(after_id=second['next_cursor'])
+        self.assertEqual(self.ids(last), ids[4:])
+        self.assertFalse(last['has_next'])
+
+        previous = self.get_page(before_id=last['previous_cursor'])
+        self.assertEqual(self.ids(previous), ids[2:4])
+        self.assertTrue(previous['has_previous'])
+
+    def test_from_end(self):
+        page = self.get_page(from_end='true', with_total='true')
+        self.assertEqual(self.ids(page), [event_place.id for event_place in self.event_places[3:]])
+        self.assertEqual(page['total_items'], 5)
+
+    def test_descending(self):
+        page = CursorPaginator(EventPlace.objects.all(), 2, descending=True).page()
+        self.assertEqual(page.object_list, self.event_places[:-3:-1])
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.get_page(page_size=-3)['model']), 1)
+        self.assertEqual(get_cursor_page_size('abc'), settings.CURSOR_PAGE_SIZE)
+        self.assertEqual(get_cursor_page_size(10 ** 6), settings.CURSOR_MAX_PAGE_SIZE)
+
+
+class SearchTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        Stadium.objects.create(city=self.city, user=self.user, address='Main street 5', name='Olympic arena',
+                               description='Description', contacts='Contacts')
+        Stadium.objects.create(city=self.city, user=self.user, address='Second street 1', name='Arena Olympic',
+                               description='Description', contacts='Contacts')
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()['model']]
+
+    def test_search_stadiums_by_name(self):
+        names = self.names(self.client.get('/api/stadiums/list/', {'name': 'olympic arena'}))
+        self.assertEqual(names[0], 'Olympic arena')
+        self.assertIn('Arena Olympic', names)
+        self.assertNotIn('Stadium', names)
+
+    def test_search_stadiums_by_address(self):
+        self.assertEqual(self.names(self.client.get('/api/stadiums/list/', {'address': 'main'})), ['Olympic arena'])
+
+    def test_empty_query_returns_everything(self):
+        self.assertEqual(search(Stadium.objects.all(), '', ['name']).count(), 3)
+
+    def test_autocomplete(self):
+        response = self.client.get('/api/search/autocomplete/', {'scope': 'stadiums', 'query': 'aren'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['value'] for item in response.json()['model']], ['Arena Olympic', 'Olympic arena'])
+
+        response = self.client.get('/api/search/autocomplete/', {'scope': 'events', 'query': 'roc'})
+        self.assertEqual(response.json()['model'], [{'id': self.event.id, 'value': 'Rock concert'}])
+
+    def test_autocomplete_unknown_scope(self):
+        response = self.client.get('/api/search/autocomplete/', {'scope': 'cities', 'query': 'a'})
+        self.assertEqual(response.status_code, 400)
+
+
+class PlaceBulkTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.places_data = [{'sector': 2, 'row': row, 'seat': seat, 'x_offset': seat, 'y_offset': row,
+                             'hall_id': self.hall.id} for row in range(10) for seat in range(10)]
+
+    def test_bulk_create(self):
+        with self.assertNumQueries(4):
+            response = self.client.post('/api/places/', {'places': self.places_data}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['model']), 100)
+        self.assertTrue(all(place['id'] for place in response.json()['model']))
+        self.assertEqual(Place.objects.filter(sector=2).count(), 100)
+
+    def test_bulk_create_unknown_hall(self):
+        response = self.client.post('/api/places/', {'places': [dict(self.places_data[0], hall_id=999)]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Place.objects.filter(sector=2).exists())
+
+    def test_bulk_update(self):
+        get_seat_map(self.event.id)
+        places_data = [
+            {'id': self.places[3].id, 'sector': 9, 'row': 9, 'seat': 9, 'x_offset': 1, 'y_offset': 1,
+             'hall_id': self.hall.id},
+            {'id': self.places[1].id, 'sector': 8, 'row': 8, 'seat': 8, 'x_offset': 1, 'y_offset': 1,
+             'hall_id': self.hall.id},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put('/api/places/', {'places': places_data}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Place.objects.get(id=self.places[3].id).sector, 9)
+        self.assertEqual(Place.objects.get(id=self.places[1].id).sector, 8)
+        self.assertEqual(get_seat_map(self.event.id)['sectors'], [1, 8, 1, 9, 1])
+
+    def test_bulk_update_unknown_place(self):
+        response = self.client.put('/api/places/', {'places': [{'id': 999, 'sector': 1, 'row': 1, 'seat': 1,
+                                                                'x_offset': 0, 'y_offset': 0,
+                                                                'hall_id': self.hall.id}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], 'One or more places were not found')
+
+    def test_import_places_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as file:
+            json.dump({'places': self.places_data}, file)
+            file.flush()
+            call_command('import_places', file.name, batch_size=40, stdout=StringIO())
+        self.assertEqual(Place.objects.filter(sector=2).count(), 100)
+
+
+class PlaceLayoutTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def generate(self, sectors, hall_id=None):
+        return self.client.post('/api/places/generate/', {'hall_id': hall_id or self.hall.id, 'sectors': sectors},
+                                format='json')
+
+    def test_generate_layout(self):
+        response = self.generate([
+            {'sector': 10, 'rows': 3, 'seats_per_row': 5, 'seats_increment': 2},
+            {'sector': 11, 'rows': 20, 'seats_per_row': 30},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['model'], {'hall_id': self.hall.id, 'places_count': 5 + 7 + 9 + 600})
+        self.assertEqual(list(Place.objects.filter(sector=10).order_by('row').values_list('row', flat=True)
+                              .distinct()), [1, 2, 3])
+        self.assertEqual(Place.objects.filter(sector=10, row=3).count(), 9)
+        self.assertEqual(Place.objects.filter(sector=11).count(), 600)
+
+    def test_generate_requires_permission(self):
+        sectors = [{'sector': 10, 'rows': 1, 'seats_per_row': 3}]
+        self.client.force_authenticate(None)
+        self.assertEqual(self.generate(sectors).status_code, 401)
+        self.client.force_authenticate(User.objects.create(login='other', is_active=True))
+        self.assertEqual(self.generate(sectors).status_code, 403)
+        self.assertFalse(Place.objects.filter(sector=10).exists())
+
+    def test_count_matches_generated_places(self):
+        sectors = [{'sector': 1, 'rows': 7, 'seats_per_row': 10, 'seats_increment': -1, 'first_row': 1,
+                    'first_seat': 1, 'origin_x': 0, 'origin_y': 0, 'seat_spacing': 1, 'row_spacing': 1,
+                    'curvature': 0}]
+        self.assertEqual(count_layout_places(sectors), len(list(generate_places(self.hall.id, sectors))))
+
+    def test_curved_row_offsets(self):
+        self.generate([{'sector': 10, 'rows': 1, 'seats_per_row': 3, 'curvature': 0.5, 'origin_y': 10}])
+        offsets = list(Place.objects.filter(sector=10).order_by('seat').values_list('x_offset', 'y_offset'))
+        self.assertEqual(offsets, [(-1.0, 10.5), (0.0, 10.0), (1.0, 10.5)])
+
+    def test_invalid_layouts(self):
+        response = self.generate([{'sector': 1, 'rows': 1, 'seats_per_row': 1},
+                                  {'sector': 1, 'rows': 1, 'seats_per_row': 1}], hall_id=999)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'hall_id', 'sectors'})
+
+        response = self.generate([{'sector': 1, 'rows': 3, 'seats_per_row': 1, 'seats_increment': -1}])
+        self.assertEqual(response.status_code, 400)
+
+        with mock.patch.object(settings, 'MAX_GENERATED_PLACES', 10):
+            response = self.generate([{'sector': 1, 'rows': 4, 'seats_per_row': 3}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Place.objects.filter(sector=1).exclude(id__in=[place.id for place in self.places]).exists())
+
+
+class EventRequestApprovalTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        EventPlace.objects.all().delete()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_request(self):
+        places = [{'place_id': place.id, 'price': 10 + index} for index, place in enumerate(self.places)]
+        response = self.client.post('/api/event-requests/', {'event_id': self.event.id, 'places': places},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['model']['id']
+
+    def approve(self, event_request_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.put('/api/event-requests/', {'id': event_request_id, 'status': 'approved'},
+                                   format='json')
+
+    def test_create_request_with_places(self):
+        event_request_id = self.create_request()
+        self.assertEqual(EventRequestPlace.objects.filter(event_request_id=event_request_id).count(), 5)
+
+    def test_create_request_with_unknown_place(self):
+        response = self.client.post('/api/event-requests/',
+                                    {'event_id': self.event.id, 'places': [{'place_id': 999, 'price': 5}]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EventRequest.objects.exists())
+
+    def test_approval_materializes_event_places(self):
+        response = self.approve(self.create_request())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(EventPlace.objects.filter(event=self.event).values_list('price', flat=True)),
+                         [10, 11, 12, 13, 14])
+        self.assertEqual(get_seat_map(self.event.id)['available'], [1] * 5)
+
+    def test_sql_materialization(self):
+        event_request = EventRequest.objects.get(id=self.create_request())
+        with mock.patch.object(settings, 'EVENT_PLACES_MATERIALIZATION', 'sql'):
+            self.assertEqual(materialize_event_places(event_request), 5)
+        self.assertEqual(sorted(EventPlace.objects.filter(event=self.event).values_list('price', flat=True)),
+                         [10, 11, 12, 13, 14])
+
+    def test_batched_materialization(self):
+        event_request = EventRequest.objects.get(id=self.create_request())
+        self.assertEqual(materialize_event_places(event_request, batch_size=2), 5)
+        self.assertEqual(EventPlace.objects.filter(event=self.event, purchase__isnull=True).count(), 5)
+
+
+class HallScheduleTest(EventPlacesTestCase):
+    def hours(self, value):
+        return datetime(2030, 1, 1, tzinfo=dt_timezone.utc) + timedelta(hours=value)
+
+    def create_event(self, start, end):
+        return Event.objects.create(hall=self.hall, user=self.user, name='Event', contacts='Contacts',
+                                    start_date=start, end_date=end)
+
+    def test_overlapping_events_are_merged(self):
+        hours = self.hours
+        schedule = HallSchedule([(hours(5), hours(7)), (hours(1), hours(3)), (hours(2), hours(4)),
+                                 (hours(10), hours(12))])
+        self.assertEqual(list(zip(schedule.starts, schedule.ends)),
+                         [(hours(1), hours(4)), (hours(5), hours(7)), (hours(10), hours(12))])
+        self.assertEqual(schedule.free_slots(hours(2), hours(11)), [(hours(4), hours(5)), (hours(7), hours(10))])
+        self.assertEqual(schedule.free_slots(hours(0), hours(20), timedelta(hours=2)),
+                         [(hours(7), hours(10)), (hours(12), hours(20))])
+
+    def test_contained_event_is_detected(self):
+        start = self.event.start_date
+        self.create_event(start + timedelta(minutes=10), start + timedelta(minutes=20))
+        self.assertFalse(is_hall_free(self.hall.id, start, self.event.end_date, exclude_event_id=self.event.id))
+        self.assertTrue(is_hall_free(self.hall.id, self.event.end_date, self.event.end_date + timedelta(hours=1)))
+
+    def test_approving_overlapping_request(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        event_request = EventRequest.objects.create(event=self.event, status='in_review')
+        self.create_event(self.event.start_date - timedelta(hours=1), self.event.start_date + timedelta(minutes=1))
+
+        response = client.put('/api/event-requests/', {'id': event_request.id, 'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.json()['errors'])
+        event_request.refresh_from_db()
+        self.assertEqual(event_request.status, 'in_review')
+
+        response = client.put('/api/event-requests/', {'id': event_request.id, 'status': 'rejected'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = client.put('/api/event-requests/', {'id': event_request.id, 'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['non_field_errors'],
+                         ['This request has already been approved or rejected'])
+
+    def test_event_should_end_after_it_starts(self):
+        data = {'start_date': self.hours(2).isoformat(), 'end_date': self.hours(1).isoformat(), 'name': 'Event',
+                'contacts': 'Contacts', 'hall_id': self.hall.id}
+        serializer = EventSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['non_field_errors'], ['Event should end after it starts'])
+        self.assertFalse(EventSerializer(self.event, data={'end_date': self.event.start_date.isoformat()},
+                                         partial=True).is_valid())
+
+    def test_inverted_event_is_normalized(self):
+        self.create_event(self.hours(3), self.hours(1))
+        schedule = get_hall_schedule(self.hall.id, self.hours(0), self.hours(5))
+        self.assertEqual(schedule.free_slots(self.hours(0), self.hours(5)),
+                         [(self.hours(0), self.hours(1)), (self.hours(3), self.hours(5))])
+
+    def test_free_slots_view(self):
+        start = self.event.start_date - timedelta(days=1)
+        response = self.client.get(f'/api/halls/free-slots/{self.hall.id}', {
+            'date_from': start.isoformat(), 'date_to': (start + timedelta(days=3)).isoformat(), 'min_duration': 30
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['model']), 2)
+
+        response = self.client.get(f'/api/halls/free-slots/{self.hall.id}', {'date_from': 'bad'})
+        self.assertEqual(response.status_code, 400)
+        for min_duration in ['inf', 'nan', '-5', '1e300']:
+            response = self.client.get(f'/api/halls/free-slots/{self.hall.id}', {'min_duration': min_duration})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/halls/free-slots/999')
+        self.assertEqual(response.status_code, 400)
+
+
+class EventMarksTest(EventPlacesTestCase):
+    def create_feedback(self, mark, event=None):
+        return Feedback.objects.create(event=event or self.event, user=self.user, text='Text', date=timezone.now(),
+                                       mark=mark)
+
+    def assertMarks(self, event, marks_sum, marks_count, average_mark):
+        event.refresh_from_db()
+        self.assertEqual((event.marks_sum, event.marks_count, event.average_mark),
+                         (marks_sum, marks_count, average_mark))
+
+    def test_marks_follow_feedback_changes(self):
+        other_event = Event.objects.create(hall=self.hall, user=self.user, name='Other', contacts='Contacts',
+                                           start_date=self.event.start_date, end_date=self.event.end_date)
+        first = self.create_feedback(4)
+        second = self.create_feedback(5)
+        self.assertMarks(self.event, 9, 2, 4.5)
+
+        second.mark = 2
+        second.save()
+        self.assertMarks(self.event, 6, 2, 3.0)
+
+        second.event = other_event
+        second.save()
+        self.assertMarks(self.event, 4, 1, 4.0)
+        self.assertMarks(other_event, 2, 1, 2.0)
+
+        first.delete()
+        self.assertMarks(self.event, 0, 0, 0.0)
+
+    def test_stale_event_save_keeps_marks(self):
+        stale = Event.objects.get(id=self.event.id)
+        self.create_feedback(5)
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertMarks(self.event, 5, 1, 5.0)
+        self.assertEqual(self.event.name, 'Renamed')
+
+    def test_edits_apply_delta_from_stored_mark(self):
+        feedback = self.create_feedback(4)
+        stale = Feedback.objects.get(id=feedback.id)
+        feedback.mark = 5
+        feedback.save()
+        stale.mark = 1
+        stale.save()
+        self.assertMarks(self.event, 1, 1, 1.0)
+
+    def test_delete_applies_stored_mark(self):
+        feedback = self.create_feedback(4)
+        Feedback.objects.filter(id=feedback.id).update(mark=2)
+        Event.objects.filter(id=self.event.id).update(marks_sum=2)
+        feedback.delete()
+        self.assertMarks(self.event, 0, 0, 0.0)
+
+    def test_stale_delete_is_not_counted_twice(self):
+        feedback = self.create_feedback(4)
+        Feedback.objects.get(id=feedback.id).delete()
+        feedback.delete()
+        self.assertMarks(self.event, 0, 0, 0.0)
+
+    def test_recompute_event_marks(self):
+        self.create_feedback(3)
+        Event.objects.update(marks_sum=100, marks_count=7, average_mark=3)
+        call_command('recompute_event_marks', stdout=StringIO())
+        self.assertMarks(self.event, 3, 1, 3.0)
+
+
+class FeedbackTestCase(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        users = [User.objects.create(login=f'user{index}') for index in range(6)]
+        for index, user in enumerate(users):
+            Feedback.objects.create(event=self.event, user=user, text='Text', date=timezone.now(), mark=index % 3 + 3)
+
+
+class FeedbackListTest(FeedbackTestCase):
+
+    def logins(self, response):
+        return [feedback['user']['name'] for feedback in response.json()['model']]
+
+    def test_list_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/feedbacks/list/{self.event.id}')
+        self.assertEqual(len(response.json()['model']), 6)
+
+    def test_cursor_pages_newest_first(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/feedbacks/list/{self.event.id}', {'pagination': 'cursor', 'page_size': 4})
+        self.assertEqual(self.logins(response), ['user5', 'user4', 'user3', 'user2'])
+
+        response = self.client.get(f'/api/feedbacks/list/{self.event.id}', {
+            'pagination': 'cursor', 'page_size': 4, 'after_id': response.json()['next_cursor']
+        })
+        self.assertEqual(self.logins(response), ['user1', 'user0'])
+        self.assertFalse(response.json()['has_next'])
+
+    def test_unknown_event(self):
+        self.assertEqual(self.client.get('/api/feedbacks/list/999').status_code, 400)
+
+
+class RatingHistogramTest(FeedbackTestCase):
+    def test_histogram(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/feedbacks/histogram/{self.event.id}')
+        self.assertEqual(response.json()['model'],
+                         {'average_mark': 4.0, 'marks_count': 6, 'histogram': {'3': 2, '4': 2, '5': 2}})
+        with self.assertNumQueries(0):
+            self.client.get(f'/api/feedbacks/histogram/{self.event.id}')
+
+    def test_feedback_changes_invalidate_histogram(self):
+        self.client.get(f'/api/feedbacks/histogram/{self.event.id}')
+        with self.captureOnCommitCallbacks(execute=True):
+            Feedback.objects.filter(mark=5).first().delete()
+        response = self.client.get(f'/api/feedbacks/histogram/{self.event.id}')
+        self.assertEqual(response.json()['model']['marks_count'], 5)
+        self.assertEqual(response.json()['model']['histogram']['5'], 1)
+
+    def test_unknown_event(self):
+        self.assertEqual(self.client.get('/api/feedbacks/histogram/999').status_code, 400)
+
+
+class RecordingChannelLayer:
+    def __init__(self, expected):
+        self.sent = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    async def group_send(self, group, message):
+        await asyncio.sleep(0.01 if message.get('slow') else 0)
+        self.sent.append((group, message['number']))
+        if len(self.sent) == self.expected:
+            self.done.set()
+
+
+class OutboxDispatcherTest(TestCase):
+    def setUp(self):
+        self.dispatcher = OutboxDispatcher()
+
+    def dispatch(self, messages):
+        channel_layer = RecordingChannelLayer(len(messages))
+        with mock.patch('core.outbox.get_channel_layer', return_value=channel_layer):
+            for group, message in messages:
+                self.dispatcher.enqueue(group, message)
+            self.assertTrue(channel_layer.done.wait(2))
+        return channel_layer.sent
+
+    def test_messages_keep_order_within_group(self):
+        messages = [('chats_1', {'number': 0, 'slow': True}), ('chats_2', {'number': 1}),
+                    ('chats_1', {'number': 2}), ('chats_1', {'number': 3, 'slow': True}), ('chats_1', {'number': 4})]
+        sent = self.dispatch(messages)
+        self.assertEqual([number for group, number in sent if group == 'chats_1'], [0, 2, 3, 4])
+
+    def test_closed_loop_falls_back_to_dispatcher_thread(self):
+        loop = asyncio.new_event_loop()
+        loop.close()
+        self.dispatcher.bind(loop)
+        self.assertEqual(self.dispatch([('chats_1', {'number': 0})]), [('chats_1', 0)])
+        self.assertEqual(self.dispatch([('chats_1', {'number': 1})]), [('chats_1', 1)])
+
+    def test_stopped_loop_falls_back_to_dispatcher_thread(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        self.dispatcher.bind(loop)
+        self.assertEqual(self.dispatch([('chats_1', {'number': 0})]), [('chats_1', 0)])
+
+    def test_bound_loop_closed_after_scheduling(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        self.dispatcher.bind(loop)
+        self.assertEqual(self.dispatch([('chats_1', {'number': 0})]), [('chats_1', 0)])
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        self.assertEqual(self.dispatch([('chats_1', {'number': 1})]), [('chats_1', 1)])
+
+    def test_drain_waits_for_pending_messages(self):
+        channel_layer = RecordingChannelLayer(3)
+        with mock.patch('core.outbox.get_channel_layer', return_value=channel_layer):
+            for number in range(3):
+                self.dispatcher.enqueue('places_1', {'number': number, 'slow': True})
+            self.assertTrue(self.dispatcher.drain(2))
+        self.assertEqual(channel_layer.sent, [('places_1', 0), ('places_1', 1), ('places_1', 2)])
+        self.assertTrue(self.dispatcher.drain(0))
+
+    def test_publish_waits_for_commit(self):
+        with mock.patch('core.outbox.dispatcher.enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        publish('chats_1', {'number': 0})
+                        raise ValueError
+                except ValueError:
+                    pass
+            enqueue.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                publish('chats_1', {'number': 1})
+            enqueue.assert_called_once_with('chats_1', {'number': 1})
+
+
+class PermissionCacheTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.group = Group.objects.create(name='Stadium admins')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(Permission.objects.get(codename='add_stadium'))
+            self.user.user_permissions.add(Permission.objects.get(codename='add_hall'))
+            self.user.groups.add(self.group)
+
+    def get_user(self):
+        return User.objects.get(id=self.user.id)
+
+    def test_permissions_are_loaded_once(self):
+        user = self.get_user()
+        with self.assertNumQueries(1):
+            self.assertTrue(has_cached_perm(user, 'core.add_stadium'))
+            self.assertTrue(has_cached_perm(user, 'core.add_hall'))
+            self.assertFalse(has_cached_perm(user, 'core.add_event'))
+        self.assertEqual(set(get_user_permissions(user)), user.get_all_permissions())
+
+        stats = get_permission_cache_stats()
+        with self.assertNumQueries(0):
+            self.assertTrue(has_cached_perm(user, 'core.add_hall'))
+            self.assertTrue(has_cached_perm(User(id=self.user.id, is_active=True), 'core.add_stadium'))
+        self.assertEqual(get_permission_cache_stats()['hits'], stats['hits'] + 2)
+
+    def test_group_changes_invalidate_permissions(self):
+        self.assertFalse(has_cached_perm(self.get_user(), 'core.add_event'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(Permission.objects.get(codename='add_event'))
+        self.assertTrue(has_cached_perm(self.get_user(), 'core.add_event'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.user_set.remove(self.user)
+        self.assertFalse(has_cached_perm(self.get_user(), 'core.add_event'))
+        self.assertTrue(has_cached_perm(self.get_user(), 'core.add_hall'))
+
+    def test_matches_has_perm(self):
+        for permission in ['add_stadium', 'core.add_stadium', 'core.delete_stadium']:
+            self.assertEqual(has_cached_perm(self.get_user(), permission), self.get_user().has_perm(permission))
+
+    def test_inactive_anonymous_and_superusers(self):
+        self.assertFalse(has_cached_perm(AnonymousUser(), 'core.add_stadium'))
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertFalse(has_cached_perm(self.get_user(), 'core.add_stadium'))
+        superuser = User(id='superuser', is_active=True, is_superuser=True)
+        with self.assertNumQueries(0):
+            self.assertTrue(CanAddStadium().has_permission(mock.Mock(user=superuser), None))
+
+    def test_approve_event_request_permission(self):
+        event_request = EventRequest.objects.create(event=self.event)
+        other_user = User.objects.create(login='other', is_active=True)
+        permission = CanApproveEventRequest()
+        owner = self.get_user()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(permission.has_permission(mock.Mock(data={'id': event_request.id}, user=owner), None))
+        self.assertFalse(permission.has_permission(mock.Mock(data={'id': event_request.id}, user=other_user), None))
+        self.assertFalse(permission.has_permission(mock.Mock(data={'id': 999}, user=owner), None))
+
+
+class EventRequestOwnersTest(EventPlacesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.stadium_admin = User.objects.create(login='stadium_admin', is_active=True, is_superuser=True)
+        self.stadium.user = self.stadium_admin
+        self.stadium.save()
+        self.event_requests = [EventRequest.objects.create(event=self.event) for _ in range(3)]
+        self.client = APIClient()
+
+    def get_owners(self):
+        return set(EventRequest.objects.values_list('organizer_id', 'stadium_user_id'))
+
+    def test_owners_are_set_on_create(self):
+        self.assertEqual(self.get_owners(), {(str(self.user.id), str(self.stadium_admin.id))})
+
+    def test_owners_follow_event_hall_and_stadium(self):
+        other_user = User.objects.create(login='other', is_active=True)
+        other_stadium = Stadium.objects.create(city=self.city, user=other_user, address='Address', name='Other',
+                                               description='Description', contacts='Contacts')
+
+        self.event.user = other_user
+        self.event.save()
+        self.assertEqual(self.get_owners(), {(str(other_user.id), str(self.stadium_admin.id))})
+
+        self.hall.stadium = other_stadium
+        self.hall.save()
+        self.assertEqual(self.get_owners(), {(str(other_user.id), str(other_user.id))})
+
+        other_stadium.user = self.user
+        other_stadium.save()
+        self.assertEqual(self.get_owners(), {(str(other_user.id), str(self.user.id))})
+
+    def get_list(self, url, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_organizer_list(self):
+        ids = [event_request.id for event_request in reversed(self.event_requests)]
+        self.get_list('/api/event-requests/list/', self.user)
+        with self.assertNumQueries(1):
+            page = self.get_list('/api/event-requests/list/', self.user)
+        self.assertEqual([event_request['id'] for event_request in page['model']], ids)
+        self.assertEqual(page['model'][0]['event'], {'id': self.event.id, 'name': 'Rock concert'})
+        self.assertEqual(self.get_list('/api/event-requests/list/', self.stadium_admin)['model'], [])
+
+        first = self.get_list('/api/event-requests/list/', self.user, pagination='cursor', page_size=2)
+        self.assertEqual([event_request['id'] for event_request in first['model']], ids[:2])
+        second = self.get_list('/api/event-requests/list/', self.user, pagination='cursor', page_size=2,
+                               after_id=first['next_cursor'])
+        self.assertEqual([event_request['id'] for event_request in second['model']], ids[2:])
+        self.assertFalse(second['has_next'])
+
+    def test_stadium_admin_list(self):
+        ids = [event_request.id for event_request in reversed(self.event_requests)]
+        self.get_list('/api/event-requests/stadium-admin/list/', self.stadium_admin)
+        with self.assertNumQueries(1):
+            page = self.get_list('/api/event-requests/stadium-admin/list/', self.stadium_admin)
+        self.assertEqual([event_request['id'] for event_request in page['model']], ids)
+        self.assertEqual(page['model'][0]['stadium'], {'id': self.stadium.id, 'name': 'Stadium'})
+        self.assertEqual(self.get_list('/api/event-requests/stadium-admin/list/', self.user)['model'], [])
+
+        page = self.get_list('/api/event-requests/stadium-admin/list/', self.stadium_admin, pagination='cursor',
+                             page_size=1, after_id=ids[0])
+        self.assertEqual([event_request['id'] for event_request in page['model']], ids[1:2])
+
+
+class StreamingResponseTest(FeedbackTestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(4):
+            Stadium.objects.create(city=self.city, user=self.user, address=f'Address {index}', name=f'Stadium {index}',
+                                   description='Description', contacts='Contacts')
+        now = timezone.now()
+        for index in range(4):
+            Event.objects.create(hall=self.hall, user=self.user, name=f'Event {index}', contacts='Contacts',
+                                 start_date=now + timedelta(days=index + 2),
+                                 end_date=now + timedelta(days=index + 2, hours=2))
+
+    async def read_stream(self, url, **params):
+        with mock.patch.object(settings, 'STREAMING_RESPONSE_CHUNK_SIZE', 2):
+            response = await self.async_client.get(url, {'stream': 'true', **params})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        return chunks, json.loads(b''.join(chunks))
+
+    async def assert_stream(self, url, item_count, ordered=True, **params):
+        chunks, data = await self.read_stream(url, **params)
+        self.assertEqual(len(chunks), (item_count + 1) // 2 + 2)
+        self.assertEqual(len(data['model']), item_count)
+        self.assertIsNone(data['errors'])
+
+        response = await self.async_client.get(url, params)
+        expected = response.json()
+        if ordered:
+            self.assertEqual(data, expected)
+        else:
+            self.assertCountEqual(data['model'], expected['model'])
+
+    async def test_stadiums_are_streamed_in_chunks(self):
+        await self.assert_stream('/api/stadiums/list/', 5, ordered=False)
+
+    async def test_feedbacks_are_streamed_in_chunks(self):
+        await self.assert_stream(f'/api/feedbacks/list/{self.event.id}', 6)
+
+    def test_announcement_is_served_from_cache(self):
+        url = f'/api/events/announcement/{self.city.id}'
+        expected = self.client.get(url).json()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'stream': 'true'})
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(len(expected['model']), 5)
+
+
+class RowSerializerTest(FeedbackTestCase):
+    def setUp(self):
+        super().setUp()
+        purchase = Purchase.objects.create(user=self.user, date=timezone.now().replace(microsecond=123456),
+                                           status='purchased')
+        EventPlace.objects.filter(id=self.event_places[0].id).update(purchase=purchase)
+        Event.objects.filter(id=self.event.id).update(photo_link='poster.png')
+        self.request = RequestFactory().get('/')
+
+    def assert_same_output(self, row_serializer_class, serializer_class, queryset, context=None):
+        context = context or {}
+        rows = row_serializer_class(row_serializer_class.project(queryset), context=context).data
+        objects = serializer_class(queryset, many=True, context=context).data
+        self.assertEqual(json.loads(FastJsonResponse(rows).content),
+                         json.loads(JsonResponse(objects, safe=False).content))
+        return rows
+
+    def test_event_places_match_serializer(self):
+        rows = self.assert_same_output(EventPlaceRowSerializer, EventPlaceGetSerializer,
+                                       EventPlace.objects.select_related('place', 'purchase').order_by('id'))
+        self.assertEqual(rows[0]['purchase']['status'], 'purchased')
+        self.assertTrue(rows[0]['purchase']['date'].endswith('.123456Z'))
+        self.assertEqual(rows[1]['purchase'], {'date': None, 'status': None})
+        self.assertEqual(rows[1]['place']['hall'], self.hall.id)
+
+    def test_feedbacks_match_serializer(self):
+        self.assert_same_output(FeedbackRowSerializer, FeedbackGetSerializer,
+                                Feedback.objects.select_related('user').order_by('-date'))
+
+    def test_events_match_serializer(self):
+        events = Event.objects.select_related('hall__stadium').order_by('id')
+        rows = self.assert_same_output(EventRowSerializer, EventListSerializer, events, {'request': self.request})
+        self.assertEqual(rows[0]['photo_link'], 'http://testserver/media/events/poster.png')
+        self.assert_same_output(EventShortRowSerializer, EventShortListSerializer, events, {'request': self.request})
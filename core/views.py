@@ -1,15 +1,19 @@
+import math
 import os
+from datetime import timedelta
 
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from rest_framework.decorators import permission_classes
 
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 
-from core.helpers import handle_uploaded_file
+from core.announcements import get_announcement
+from core.helpers import handle_uploaded_file, get_aware_datetime
+from core.holds import get_hold_expiration
 from core.permissions import CanAddStadium, CanChangeStadium, CanDeleteStadium, CanAddHall, CanChangeHall, \
     CanDeleteHall, \
     CanAddPlace, CanChangePlace, CanDeletePlace, CanAddEvent, CanChangeEvent, CanDeleteEvent, CanAddPromotion, \
@@ -18,14 +22,22 @@ from core.permissions import CanAddStadium, CanChangeStadium, CanDeleteStadium,
     CanAddEventRequestPlace, CanDeleteEventRequestPlace, CanViewEventRequest
 from core.models import City, Stadium, Hall, Place, Event, Promotion, Feedback, PromotionEvent, Photo, Video, User, \
     EventRequest, EventRequestPlace, EventPlace, Purchase
-from core.response import Response, PageResponse
+from core.pagination import is_cursor_pagination, get_cursor_page
+from core.ratings import get_rating_histogram
+from core.response import Response, PageResponse, CursorPageResponse, StreamingResponse, FastJsonResponse, \
+    is_streaming_response
+from core.rows import EventPlaceRowSerializer, FeedbackRowSerializer, EventRowSerializer, EventShortRowSerializer
+from core.scheduling import get_hall_schedule
+from core.search import search, autocomplete
+from core.seat_map import get_seat_map, pack_seat_map, set_places_availability, invalidate_seat_maps
 from core.serializers import CitySerializer, UserRegistrationSerializer, StadiumSerializer, StadiumGetSerializer, \
-    HallSerializer, HallGetSerializer, PlaceGetSerializer, PlaceSerializer, EventListSerializer, \
+    HallSerializer, HallGetSerializer, PlaceGetSerializer, PlaceSerializer, \
     EventGetSerializer, EventSerializer, PromotionSerializer, PromotionGetSerializer, PromotionEventSerializer, \
     FeedbackGetSerializer, FeedbackSerializer, EventPhotoSerializer, EventVideoSerializer, UserGetSerializer, \
     EventRequestCreateSerializer, EventRequestDetailsSerializer, EventRequestUpdateSerializer, \
-    EventRequestPlaceCreateSerializer, EventRequestPlaceGetSerializer, EventPlaceGetSerializer, \
-    EventRequestGetSerializer, EventRequestStadiumGetSerializer, PurchaseDetailsSerializer, PurchaseGetSerializer
+    EventRequestPlaceCreateSerializer, EventRequestPlaceGetSerializer, \
+    EventRequestGetSerializer, EventRequestStadiumGetSerializer, PurchaseDetailsSerializer, PurchaseGetSerializer, \
+    PlaceLayoutSerializer
 from ticket_sales_backend import settings
 from ticket_sales_backend.settings import MAX_EVENT_PHOTOS
 
@@ -48,9 +60,18 @@ class StadiumListView(APIView):
             'address': request.query_params.get('address', '')
         }
 
-        stadiums = Stadium.objects.all().filter(
-            name__icontains=query_filter['name'],
-            address__icontains=query_filter['address'])
+        stadiums = Stadium.objects.select_related('city')
+        stadiums = search(stadiums, query_filter['address'], ['address'], order=not query_filter['name'])
+        stadiums = search(stadiums, query_filter['name'], ['name'], vector_field='search_vector')
+
+        if is_streaming_response(request):
+            response = StreamingResponse(
+                model=stadiums,
+                message="The list of stadiums was retrieved successfully",
+                serializer_class=StadiumGetSerializer
+            )
+            return StreamingHttpResponse(response.to_stream(), content_type='application/json', status=200)
+
         serializer = StadiumGetSerializer(stadiums, many=True)
 
         response = Response(model=serializer.data, message="The list of stadiums was retrieved successfully")
@@ -175,6 +196,39 @@ class HallListView(APIView):
         return JsonResponse(response.to_dict(), status=200)
 
 
+class HallFreeSlotsView(APIView):
+    def get(self, request, hall_id):
+        if not Hall.objects.filter(id=hall_id).exists():
+            response = Response(errors="Hall was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        try:
+            date_from = get_aware_datetime(request.query_params.get('date_from')) or timezone.now()
+            date_to = get_aware_datetime(request.query_params.get('date_to')) or \
+                date_from + timedelta(days=settings.HALL_SCHEDULE_DEFAULT_DAYS)
+            min_duration = float(request.query_params.get('min_duration', 0))
+            if not math.isfinite(min_duration) or min_duration < 0:
+                raise ValueError
+            min_duration = timedelta(minutes=min_duration)
+        except (ValueError, OverflowError):
+            response = Response(errors="Dates or duration have invalid format")
+            return JsonResponse(response.to_dict(), status=400)
+
+        if date_to <= date_from or date_to - date_from > timedelta(days=settings.HALL_SCHEDULE_MAX_DAYS):
+            response = Response(errors=f"Date range should be positive and not longer than "
+                                       f"{settings.HALL_SCHEDULE_MAX_DAYS} days")
+            return JsonResponse(response.to_dict(), status=400)
+
+        schedule = get_hall_schedule(hall_id, date_from, date_to)
+        slots = [
+            {'start_date': start, 'end_date': end}
+            for start, end in schedule.free_slots(date_from, date_to, min_duration)
+        ]
+
+        response = Response(model=slots, message="Free slots of the hall were retrieved successfully")
+        return JsonResponse(response.to_dict(), status=200)
+
+
 class HallView(APIView):
     def get(self, request, id):
         try:
@@ -234,6 +288,16 @@ class PlaceListView(APIView):
     def get(self, request, hall_id):
         places = Place.objects.filter(hall_id=hall_id).order_by("id")
 
+        if is_cursor_pagination(request):
+            page = get_cursor_page(places, request.query_params, request.query_params.get("page_size"))
+            serializer = PlaceGetSerializer(page.object_list, many=True)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of places was retrieved successfully",
+                page=page
+            )
+            return JsonResponse(response.to_dict(), status=200)
+
         page_number = request.query_params.get("page_number")
         per_page = request.query_params.get("page_size")
         paginator = Paginator(places, per_page)
@@ -271,28 +335,30 @@ class PlaceView(APIView):
     @permission_classes([CanChangePlace])
     def put(self, request):
         place_data = request.data.get('places', [])
-        place_ids = [item['id'] for item in place_data]
-
         try:
-            places = Place.objects.filter(id__in=place_ids)
-        except Place.DoesNotExist:
+            place_ids = [int(item['id']) for item in place_data]
+        except (KeyError, TypeError, ValueError):
+            response = Response(errors="Place ids were not provided")
+            return JsonResponse(response.to_dict(), status=400)
+
+        places = Place.objects.in_bulk(place_ids)
+        if len(places) != len(set(place_ids)):
             response = Response(errors="One or more places were not found")
             return JsonResponse(response.to_dict(), status=400)
 
-        response_model = []
-        with transaction.atomic():
-            for i in range(len(places)):
-                serializer = PlaceSerializer(places[i], data=place_data[i])
-                if serializer.is_valid():
-                    place = serializer.save()
-                    serializer = PlaceGetSerializer(place)
-                    response_model.append(serializer.data)
-                else:
-                    response = Response(errors=serializer.errors)
-                    return JsonResponse(response.to_dict(), status=400)
+        serializer = PlaceSerializer([places[place_id] for place_id in place_ids], data=place_data, many=True)
+        if serializer.is_valid():
+            with transaction.atomic():
+                event_ids = EventPlace.objects.filter(place_id__in=place_ids).values_list('event_id', flat=True)
+                invalidate_seat_maps(event_ids)
+                places = serializer.save()
 
-        response = Response(model=response_model, message="Places were updated successfully")
-        return JsonResponse(response.to_dict(), status=200)
+            serializer = PlaceGetSerializer(places, many=True)
+            response = Response(model=serializer.data, message="Places were updated successfully")
+            return JsonResponse(response.to_dict(), status=200)
+
+        response = Response(errors=serializer.errors)
+        return JsonResponse(response.to_dict(), status=400)
 
     @permission_classes([CanDeletePlace])
     def delete(self, request):
@@ -304,12 +370,30 @@ class PlaceView(APIView):
             return JsonResponse(response.to_dict(), status=400)
 
         with transaction.atomic():
+            invalidate_seat_maps(EventPlace.objects.filter(place__in=places).values_list('event_id', flat=True))
             places.delete()
 
         response = Response(message="Places were deleted successfully")
         return JsonResponse(response.to_dict(), status=204)
 
 
+class PlaceLayoutView(APIView):
+    permission_classes = [CanAddPlace]
+
+    def post(self, request):
+        serializer = PlaceLayoutSerializer(data=request.data)
+        if serializer.is_valid():
+            with transaction.atomic():
+                places_count = serializer.save()
+
+            model = {'hall_id': serializer.validated_data['hall_id'], 'places_count': places_count}
+            response = Response(model=model, message="Places were generated successfully")
+            return JsonResponse(response.to_dict(), status=201)
+
+        response = Response(errors=serializer.errors)
+        return JsonResponse(response.to_dict(), status=400)
+
+
 class EventView(APIView):
     def get(self, request, id):
         try:
@@ -372,6 +456,12 @@ class EventView(APIView):
         return JsonResponse(response.to_dict(), status=204)
 
 
+def get_event_listing(events, request):
+    if request.query_params.get('projection') == 'short':
+        return EventShortRowSerializer.project(events), EventShortRowSerializer
+    return EventRowSerializer.project(events), EventRowSerializer
+
+
 class EventAnnouncementView(APIView):
     def get(self, request, city_id):
         try:
@@ -379,12 +469,39 @@ class EventAnnouncementView(APIView):
         except City.DoesNotExist:
             response = Response(errors="City was not found")
             return JsonResponse(response.to_dict(), status=400)
-        now = timezone.now()
-        events = Event.objects.filter(hall__stadium__city_id=city_id, start_date__gt=now).order_by('start_date')
-        serializer = EventListSerializer(events, many=True, context={'request': request})
+        def build_announcement(cutoff):
+            events, serializer_class = get_event_listing(
+                Event.objects.filter(hall__stadium__city_id=city_id, start_date__gt=cutoff).order_by('start_date'),
+                request
+            )
+            return serializer_class(events, many=True, context={'request': request}).data
+
+        events = get_announcement(
+            city_id,
+            request.query_params.get('projection'),
+            request.build_absolute_uri('/'),
+            build_announcement
+        )
 
-        response = Response(model=serializer.data, message="The announcement of events was retrieved successfully")
-        return JsonResponse(response.to_dict(), status=200)
+        per_page = request.query_params.get("page_size")
+        if per_page is None:
+            response = Response(model=events, message="The announcement of events was retrieved successfully")
+            return FastJsonResponse(response.to_dict(), status=200)
+
+        page_number = request.query_params.get("page_number")
+        paginator = Paginator(events, per_page)
+        try:
+            page_obj = paginator.page(page_number)
+        except:
+            page_obj = paginator.page(1)
+
+        response = PageResponse(
+            model=page_obj.object_list,
+            message="Page of the announcement of events was retrieved successfully",
+            page_obj=page_obj,
+            paginator=paginator
+        )
+        return FastJsonResponse(response.to_dict(), status=200)
 
 
 class EventCatalogView(APIView):
@@ -403,9 +520,10 @@ class EventCatalogView(APIView):
             start_date__gt=query_filter['start_date_from'],
             start_date__lt=query_filter['start_date_to'],
             end_date__gt=query_filter['end_date_from'],
-            end_date__lt=query_filter['end_date_to'],
-            name__icontains=query_filter['name']
+            end_date__lt=query_filter['end_date_to']
         )
+        events = search(events, query_filter['name'], ['name'], vector_field='search_vector')
+        events, serializer_class = get_event_listing(events, request)
 
         page_number = request.query_params.get("page_number")
         per_page = request.query_params.get("page_size")
@@ -415,10 +533,10 @@ class EventCatalogView(APIView):
         except:
             page_obj = paginator.page(1)
 
-        serializer = EventListSerializer(page_obj.object_list, many=True, context={'request': request})
+        serializer = serializer_class(page_obj.object_list, many=True, context={'request': request})
 
         response = Response(model=serializer.data, message="The list of events was retrieved successfully")
-        return JsonResponse(response.to_dict(), status=200)
+        return FastJsonResponse(response.to_dict(), status=200)
 
 
 class EventPhotoListView(APIView):
@@ -579,7 +697,8 @@ class EventRequestView(APIView):
 
         serializer = EventRequestUpdateSerializer(event, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
             response = Response(message="Event request info was updated successfully")
             return JsonResponse(response.to_dict(), status=200)
 
@@ -602,7 +721,17 @@ class EventRequestView(APIView):
 
 class EventPlaceListView(APIView):
     def get(self, request, event_id):
-        event_places = EventPlace.objects.filter(event_id=event_id).order_by("id")
+        event_places = EventPlaceRowSerializer.project(EventPlace.objects.filter(event_id=event_id).order_by("id"))
+
+        if is_cursor_pagination(request):
+            page = get_cursor_page(event_places, request.query_params, request.query_params.get("page_size"))
+            serializer = EventPlaceRowSerializer(page.object_list)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of event places was retrieved successfully",
+                page=page
+            )
+            return FastJsonResponse(response.to_dict(), status=200)
 
         page_number = request.query_params.get("page_number")
         per_page = request.query_params.get("page_size")
@@ -612,7 +741,7 @@ class EventPlaceListView(APIView):
         except:
             page_obj = paginator.page(1)
 
-        serializer = EventPlaceGetSerializer(page_obj.object_list, many=True)
+        serializer = EventPlaceRowSerializer(page_obj.object_list)
 
         response = PageResponse(
             model=serializer.data,
@@ -620,6 +749,20 @@ class EventPlaceListView(APIView):
             page_obj=page_obj,
             paginator=paginator
         )
+        return FastJsonResponse(response.to_dict(), status=200)
+
+
+class EventSeatMapView(APIView):
+    def get(self, request, event_id):
+        if not Event.objects.filter(id=event_id).exists():
+            response = Response(errors="Event was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        seat_map = get_seat_map(event_id)
+        if request.query_params.get('encoding') == 'binary':
+            return HttpResponse(pack_seat_map(seat_map), content_type='application/octet-stream', status=200)
+
+        response = Response(model=seat_map, message="Seat map of event was retrieved successfully")
         return JsonResponse(response.to_dict(), status=200)
 
 
@@ -627,6 +770,16 @@ class EventRequestPlaceListView(APIView):
     def get(self, request, event_request_id):
         event_request_places = EventRequestPlace.objects.filter(event_request_id=event_request_id).order_by("id")
 
+        if is_cursor_pagination(request):
+            page = get_cursor_page(event_request_places, request.query_params, request.query_params.get("page_size"))
+            serializer = EventRequestPlaceGetSerializer(page.object_list, many=True)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of places for event request was retrieved successfully",
+                page=page
+            )
+            return JsonResponse(response.to_dict(), status=200)
+
         page_number = request.query_params.get("page_number")
         per_page = request.query_params.get("page_size")
         paginator = Paginator(event_request_places, per_page)
@@ -650,8 +803,28 @@ class EventRequestUserListView(APIView):
     permission_classes = [CanViewEventRequest]
 
     def get(self, request):
-        event_requests = EventRequest.objects.filter(event__user=request.user).order_by('-id')
-        serializer = EventRequestGetSerializer(event_requests, many=True)
+        event_requests = EventRequest.objects.filter(organizer=request.user).listing()
+
+        if is_cursor_pagination(request):
+            page = get_cursor_page(event_requests, request.query_params, request.query_params.get("page_size"),
+                                   descending=True)
+            serializer = EventRequestGetSerializer(page.object_list, many=True)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of event requests of current user was retrieved successfully",
+                page=page
+            )
+            return JsonResponse(response.to_dict(), status=200)
+
+        if is_streaming_response(request):
+            response = StreamingResponse(
+                model=event_requests.order_by('-id'),
+                message="Event requests of current user were retrieved successfully",
+                serializer_class=EventRequestGetSerializer
+            )
+            return StreamingHttpResponse(response.to_stream(), content_type='application/json', status=200)
+
+        serializer = EventRequestGetSerializer(event_requests.order_by('-id'), many=True)
 
         response = Response(
             model=serializer.data,
@@ -664,8 +837,28 @@ class EventRequestStadiumListView(APIView):
     permission_classes = [CanViewEventRequest]
 
     def get(self, request):
-        event_requests = EventRequest.objects.filter(event__hall__stadium__user=request.user).order_by('-id')
-        serializer = EventRequestStadiumGetSerializer(event_requests, many=True)
+        event_requests = EventRequest.objects.filter(stadium_user=request.user).listing()
+
+        if is_cursor_pagination(request):
+            page = get_cursor_page(event_requests, request.query_params, request.query_params.get("page_size"),
+                                   descending=True)
+            serializer = EventRequestStadiumGetSerializer(page.object_list, many=True)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of event requests for current user was retrieved successfully",
+                page=page
+            )
+            return JsonResponse(response.to_dict(), status=200)
+
+        if is_streaming_response(request):
+            response = StreamingResponse(
+                model=event_requests.order_by('-id'),
+                message="Event requests for current user were retrieved successfully",
+                serializer_class=EventRequestStadiumGetSerializer
+            )
+            return StreamingHttpResponse(response.to_stream(), content_type='application/json', status=200)
+
+        serializer = EventRequestStadiumGetSerializer(event_requests.order_by('-id'), many=True)
 
         response = Response(
             model=serializer.data,
@@ -711,7 +904,11 @@ class PurchaseCartView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        booked_purchases = Purchase.objects.filter(user=request.user, status='booked').order_by('-id')
+        booked_purchases = Purchase.objects.filter(
+            user=request.user,
+            status='booked',
+            expires_at__gt=timezone.now()
+        ).order_by('-id')
         serializer = PurchaseDetailsSerializer(booked_purchases, many=True)
 
         response = Response(
@@ -740,18 +937,30 @@ class PurchaseView(APIView):
 
     def post(self, request):
         try:
-            event_places = EventPlace.objects.filter(id__in=request.data['event_place_ids'])
-        except EventPlace.DoesNotExist:
-            response = Response(errors="Event place was not found")
+            event_place_ids = list(dict.fromkeys(int(event_place_id)
+                                                 for event_place_id in request.data['event_place_ids']))
+        except (KeyError, TypeError, ValueError):
+            response = Response(errors="Event place ids were not provided")
             return JsonResponse(response.to_dict(), status=400)
 
         with transaction.atomic():
-            purchase = Purchase.objects.create(date=timezone.now(), user=request.user)
-            purchase.save()
+            purchase = Purchase.objects.create(date=timezone.now(), user=request.user,
+                                               expires_at=get_hold_expiration())
+
+            EventPlace.objects.filter(id__in=event_place_ids, purchase__isnull=True).update(purchase=purchase)
+            booked_places = dict(EventPlace.objects.filter(purchase=purchase).values_list('id', 'event_id'))
 
-            for event_place in event_places:
-                event_place.purchase = purchase
-                event_place.save()
+            unavailable_ids = [event_place_id for event_place_id in event_place_ids
+                               if event_place_id not in booked_places]
+            if unavailable_ids:
+                transaction.set_rollback(True)
+                response = Response(
+                    model={"event_place_ids": unavailable_ids},
+                    errors="Some of the selected places were not found or have already been booked"
+                )
+                return JsonResponse(response.to_dict(), status=409)
+
+            set_places_availability(booked_places.items(), False)
 
         serializer = PurchaseDetailsSerializer(purchase)
         response = Response(model=serializer.data, message="You have booked tickets successfully")
@@ -765,9 +974,21 @@ class PurchaseView(APIView):
             return JsonResponse(response.to_dict(), status=400)
 
         with transaction.atomic():
-            for purchase in purchases:
-                purchase.status = 'purchased'
-                purchase.save()
+            booked_ids = list(purchases.filter(status='booked').values_list('id', flat=True))
+            confirmed = Purchase.objects.filter(
+                id__in=booked_ids, status='booked', expires_at__gt=timezone.now()
+            ).update(status='purchased', expires_at=None)
+
+            if confirmed != len(booked_ids):
+                confirmed_ids = set(Purchase.objects.filter(id__in=booked_ids, status='purchased')
+                                    .values_list('id', flat=True))
+                transaction.set_rollback(True)
+                response = Response(
+                    model={"purchase_ids": [purchase_id for purchase_id in booked_ids
+                                            if purchase_id not in confirmed_ids]},
+                    errors="Booking time for some of the purchases has expired"
+                )
+                return JsonResponse(response.to_dict(), status=409)
 
         serializer = PurchaseGetSerializer(purchases, many=True)
         response = Response(model=serializer.data, message="Purchases were saved successfully")
@@ -780,7 +1001,10 @@ class PurchaseView(APIView):
             response = Response(errors="Purchase was not found")
             return JsonResponse(response.to_dict(), status=400)
 
-        purchase.delete()
+        with transaction.atomic():
+            event_places = list(EventPlace.objects.filter(purchase__in=purchase).values_list('id', 'event_id'))
+            purchase.delete()
+            set_places_availability(event_places, True)
 
         response = Response(message="Your purchase was deleted successfully")
         return JsonResponse(response.to_dict(), status=204)
@@ -927,9 +1151,41 @@ class FeedbackListView(APIView):
         except Event.DoesNotExist:
             response = Response(errors="Event was not found")
             return JsonResponse(response.to_dict(), status=400)
-        feedbacks = Feedback.objects.filter(event_id=event_id).order_by('-date')
-        serializer = FeedbackGetSerializer(feedbacks, many=True)
+        feedbacks = FeedbackRowSerializer.project(Feedback.objects.filter(event_id=event_id))
+
+        if is_cursor_pagination(request):
+            page = get_cursor_page(feedbacks, request.query_params, request.query_params.get("page_size"),
+                                   descending=True)
+            serializer = FeedbackRowSerializer(page.object_list)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of feedbacks was retrieved successfully",
+                page=page
+            )
+            return FastJsonResponse(response.to_dict(), status=200)
+
+        if is_streaming_response(request):
+            response = StreamingResponse(
+                model=feedbacks.order_by('-date'),
+                message="The list of feedbacks was retrieved successfully",
+                serializer_class=FeedbackRowSerializer
+            )
+            return StreamingHttpResponse(response.to_stream(), content_type='application/json', status=200)
+
+        serializer = FeedbackRowSerializer(feedbacks.order_by('-date'))
         response = Response(model=serializer.data, message="The list of feedbacks was retrieved successfully")
+        return FastJsonResponse(response.to_dict(), status=200)
+
+
+class FeedbackHistogramView(APIView):
+    def get(self, request, event_id):
+        try:
+            histogram = get_rating_histogram(event_id)
+        except Event.DoesNotExist:
+            response = Response(errors="Event was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        response = Response(model=histogram, message="Rating histogram was retrieved successfully")
         return JsonResponse(response.to_dict(), status=200)
 
 
@@ -982,7 +1238,7 @@ class UserListView(APIView):
             'login': request.query_params.get('login', ''),
         }
 
-        users = User.objects.all().filter(login__icontains=query_filter['login'])
+        users = search(User.objects.order_by('login'), query_filter['login'], ['login'])
 
         page_number = request.query_params.get("page_number")
         per_page = request.query_params.get("page_size")
@@ -998,6 +1254,27 @@ class UserListView(APIView):
         return JsonResponse(response.to_dict(), status=200)
 
 
+class SearchAutocompleteView(APIView):
+    SCOPES = {
+        'events': (Event.objects.all(), 'name', 'search_vector'),
+        'stadiums': (Stadium.objects.all(), 'name', 'search_vector'),
+        'addresses': (Stadium.objects.all(), 'address', None),
+        'users': (User.objects.all(), 'login', None),
+    }
+
+    def get(self, request):
+        scope = request.query_params.get('scope')
+        if scope not in self.SCOPES:
+            response = Response(errors=f"Search scope should be one of: {', '.join(self.SCOPES)}")
+            return JsonResponse(response.to_dict(), status=400)
+
+        queryset, field, vector_field = self.SCOPES[scope]
+        suggestions = autocomplete(queryset, request.query_params.get('query', ''), field, vector_field)
+
+        response = Response(model=suggestions, message="Search suggestions were retrieved successfully")
+        return JsonResponse(response.to_dict(), status=200)
+
+
 class UserRegistrationView(APIView):
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
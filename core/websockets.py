@@ -0,0 +1,38 @@
+import json
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from core.outbox import bind_dispatcher, publish
+
+
+class EventPlaceConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
+        bind_dispatcher()
+        self.event_id = self.scope['url_route']['kwargs']['event_id']
+        await self.channel_layer.group_add(get_event_places_key(self.event_id), self.channel_name)
+        await super().connect()
+
+    async def places_update(self, text_data=None):
+        await self.send(json.dumps(text_data))
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(get_event_places_key(self.event_id), self.channel_name)
+        await super().disconnect(close_code)
+
+
+def send_places_update(event_id, event_place_ids, available):
+    publish(
+        get_event_places_key(event_id),
+        {
+            'type': 'places.update',
+            'data': {
+                'event_id': event_id,
+                'event_place_ids': event_place_ids,
+                'available': available
+            }
+        }
+    )
+
+
+def get_event_places_key(event_id):
+    return f'event_places_{event_id}'
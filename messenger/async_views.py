@@ -0,0 +1,163 @@
+import json
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse, QueryDict
+from django.http.multipartparser import MultiPartParser, MultiPartParserError
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from core.models import User
+from core.pagination import is_cursor_pagination
+from core.response import Response, PageResponse, CursorPageResponse, FastJsonResponse
+from core.rows import ChatMessageRowSerializer
+from messenger import services
+from messenger.models import ChatMessage
+from messenger.serializers import ChatMessageGetSerializer, ChatMessageUpdateSerializer, ChatGetSerializer
+from messenger.token_auth import get_request_user
+from messenger.websockets import send_message, send_new_message
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAuthenticatedView(View):
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await get_request_user(request)
+        if request.user is None:
+            response = Response(errors="Authentication credentials were not provided or are invalid")
+            return JsonResponse(response.to_dict(), status=401)
+
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_data(self, request):
+        if request.content_type == 'application/x-www-form-urlencoded':
+            return QueryDict(request.body, encoding=request.encoding).dict()
+
+        if request.content_type == 'multipart/form-data':
+            parser = MultiPartParser(request.META, BytesIO(request.body), request.upload_handlers, request.encoding)
+            try:
+                data, _ = parser.parse()
+            except MultiPartParserError:
+                return None
+            return data.dict()
+
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+class AsyncChatListView(AsyncAuthenticatedView):
+    async def get(self, request):
+        page_obj, paginator = await services.get_chat_page(
+            request.user,
+            request.GET.get("pageNumber"),
+            request.GET.get("pageSize")
+        )
+        serializer = ChatGetSerializer(page_obj.object_list, many=True)
+
+        response = PageResponse(
+            model=serializer.data,
+            message="Page of chats was retrieved successfully",
+            page_obj=page_obj,
+            paginator=paginator
+        )
+        return JsonResponse(response.to_dict(), status=200)
+
+
+class AsyncChatMessageListView(AsyncAuthenticatedView):
+    async def get(self, request, chat_id):
+        if not await services.chat_exists(chat_id):
+            response = Response(errors="Chat was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        if is_cursor_pagination(request):
+            page = await services.get_message_cursor_page(chat_id, request.GET, request.GET.get("pageSize"))
+            serializer = ChatMessageRowSerializer(page.object_list)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of chat messages was retrieved successfully",
+                page=page
+            )
+            return FastJsonResponse(response.to_dict(), status=200)
+
+        page_obj, paginator = await services.get_message_page(
+            chat_id,
+            request.GET.get("pageNumber"),
+            request.GET.get("pageSize")
+        )
+        serializer = ChatMessageRowSerializer(page_obj.object_list)
+
+        response = PageResponse(
+            model=serializer.data,
+            message="Page of chat messages was retrieved successfully",
+            page_obj=page_obj,
+            paginator=paginator
+        )
+        return FastJsonResponse(response.to_dict(), status=200)
+
+
+class AsyncChatMessageView(AsyncAuthenticatedView):
+    async def post(self, request):
+        data = self.get_data(request)
+        if data is None:
+            response = Response(errors="Request body should be a JSON object or form data")
+            return JsonResponse(response.to_dict(), status=400)
+
+        try:
+            recipient = await User.objects.aget(id=data.get("recipient_id"))
+        except (User.DoesNotExist, ValidationError):
+            response = Response(errors="Message recipient was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        serializer = ChatMessageUpdateSerializer(data=data)
+        if not serializer.is_valid():
+            response = Response(errors=serializer.errors)
+            return JsonResponse(response.to_dict(), status=400)
+
+        message, created = await services.create_message(request.user, recipient, serializer.validated_data['text'])
+        serializer = ChatMessageGetSerializer(message)
+        send_new_message(serializer.data, created, [request.user.id, recipient.id])
+
+        response = Response(model=serializer.data, message="Message was created successfully")
+        return JsonResponse(response.to_dict(), status=200)
+
+    async def put(self, request, id):
+        data = self.get_data(request)
+        if data is None:
+            response = Response(errors="Request body should be a JSON object or form data")
+            return JsonResponse(response.to_dict(), status=400)
+
+        try:
+            message = await services.get_user_message(request.user, id)
+        except ChatMessage.DoesNotExist:
+            response = Response(errors="Message was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        serializer = ChatMessageUpdateSerializer(message, data=data)
+        if serializer.is_valid():
+            message = await services.update_message(message, serializer.validated_data['text'])
+            serializer = ChatMessageGetSerializer(message)
+
+            send_message('message.update', serializer.data, serializer.data['info']['chat_id'])
+
+            response = Response(model=serializer.data, message="Message info was updated successfully")
+            return JsonResponse(response.to_dict(), status=200)
+
+        response = Response(errors=serializer.errors)
+        return JsonResponse(response.to_dict(), status=400)
+
+    async def delete(self, request, id):
+        try:
+            message = await services.get_user_message(request.user, id)
+        except ChatMessage.DoesNotExist:
+            response = Response(errors="Message was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        chat_id = await services.delete_message(message)
+
+        send_message('message.delete', id, chat_id)
+
+        response = Response(message="Message was deleted successfully")
+        return JsonResponse(response.to_dict(), status=204)
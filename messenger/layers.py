@@ -0,0 +1,176 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    extensions = ['groups', 'flush']
+
+    def __init__(self, path, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None,
+                 poll_interval=0.05, max_poll_interval=0.5, **kwargs):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.channel_capacity = self.compile_capacities(self.channel_capacity)
+        self.path = path
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.client_prefix = uuid.uuid4().hex
+        self.connection = None
+        self.connection_lock = threading.Lock()
+        self.create_tables()
+
+    @contextmanager
+    def connect(self):
+        with self.connection_lock:
+            if self.connection is None:
+                self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                                  check_same_thread=False)
+                self.connection.execute('PRAGMA journal_mode=WAL')
+            yield self.connection
+
+    def create_tables(self):
+        with self.connect() as connection:
+            connection.executescript(
+                'CREATE TABLE IF NOT EXISTS channel_messages ('
+                '    id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                '    channel TEXT NOT NULL,'
+                '    message TEXT NOT NULL,'
+                '    expires REAL NOT NULL'
+                ');'
+                'CREATE INDEX IF NOT EXISTS channel_messages_channel ON channel_messages (channel, id);'
+                'CREATE TABLE IF NOT EXISTS channel_groups ('
+                '    group_name TEXT NOT NULL,'
+                '    channel TEXT NOT NULL,'
+                '    expires REAL NOT NULL,'
+                '    PRIMARY KEY (group_name, channel)'
+                ');'
+            )
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        assert "__asgi_channel__" not in message
+
+        if not await asyncio.to_thread(self.insert_messages, [channel], json.dumps(message)):
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+
+        delay = self.poll_interval
+        while True:
+            message = await asyncio.to_thread(self.pop_message, channel)
+            if message is not None:
+                return json.loads(message)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    async def new_channel(self, prefix='specific'):
+        return f'{prefix}.{self.client_prefix}!{uuid.uuid4().hex}'
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+
+        def add():
+            with self.connect() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO channel_groups (group_name, channel, expires) VALUES (?, ?, ?)',
+                    (group, channel, time.time() + self.group_expiry)
+                )
+
+        await asyncio.to_thread(add)
+
+    async def group_discard(self, group, channel):
+        assert self.valid_channel_name(channel), "Invalid channel name"
+        assert self.valid_group_name(group), "Invalid group name"
+
+        def discard():
+            with self.connect() as connection:
+                connection.execute('DELETE FROM channel_groups WHERE group_name = ? AND channel = ?', (group, channel))
+
+        await asyncio.to_thread(discard)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Invalid group name"
+
+        def send():
+            with self.connect() as connection:
+                channels = [
+                    channel for channel, in connection.execute(
+                        'SELECT channel FROM channel_groups WHERE group_name = ? AND expires > ?', (group, time.time())
+                    )
+                ]
+            if channels:
+                self.insert_messages(channels, json.dumps(message))
+
+        await asyncio.to_thread(send)
+
+    async def flush(self):
+        def flush():
+            with self.connect() as connection:
+                connection.executescript('DELETE FROM channel_messages; DELETE FROM channel_groups;')
+
+        await asyncio.to_thread(flush)
+
+    async def close(self):
+        def close():
+            with self.connection_lock:
+                if self.connection is not None:
+                    self.connection.close()
+                    self.connection = None
+
+        await asyncio.to_thread(close)
+
+    def insert_messages(self, channels, message):
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.clean_expired(connection, now)
+                placeholders = ', '.join('?' * len(channels))
+                queued = dict(connection.execute(
+                    f'SELECT channel, COUNT(*) FROM channel_messages '
+                    f'WHERE channel IN ({placeholders}) GROUP BY channel',
+                    channels
+                ))
+                accepted = [channel for channel in channels if queued.get(channel, 0) < self.get_capacity(channel)]
+                connection.executemany(
+                    'INSERT INTO channel_messages (channel, message, expires) VALUES (?, ?, ?)',
+                    [(channel, message, now + self.expiry) for channel in accepted]
+                )
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        return len(accepted) == len(channels)
+
+    def pop_message(self, channel):
+        with self.connect() as connection:
+            row = connection.execute(
+                'DELETE FROM channel_messages WHERE id = ('
+                '    SELECT id FROM channel_messages WHERE channel = ? AND expires > ? ORDER BY id LIMIT 1'
+                ') RETURNING message',
+                (channel, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def clean_expired(self, connection, now):
+        expired = [
+            channel for channel, in connection.execute(
+                'SELECT DISTINCT channel FROM channel_messages WHERE expires <= ?', (now,)
+            )
+        ]
+        if expired:
+            placeholders = ', '.join('?' * len(expired))
+            connection.execute('DELETE FROM channel_messages WHERE expires <= ?', (now,))
+            connection.execute(f'DELETE FROM channel_groups WHERE channel IN ({placeholders})', expired)
+        connection.execute('DELETE FROM channel_groups WHERE expires <= ?', (now,))
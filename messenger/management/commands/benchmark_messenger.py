@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, AsyncRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User
+from messenger.async_views import AsyncChatListView, AsyncChatMessageListView
+from messenger.models import ChatMember
+from messenger.views import ChatListView, ChatMessageListView
+
+
+class Command(BaseCommand):
+    help = 'Compares throughput of the async messenger views with their sync DRF equivalents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('login')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(login=options['login'])
+        except User.DoesNotExist:
+            raise CommandError("User was not found")
+
+        chat_id = ChatMember.objects.filter(user=user).values_list('chat_id', flat=True).first()
+        if chat_id is None:
+            raise CommandError("User has no chats")
+
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        query = {'pageNumber': 1, 'pageSize': options['page_size']}
+        endpoints = [
+            ('chat list', '/api/chats/', {}, ChatListView, AsyncChatListView),
+            ('message list', f'/api/messages/list/{chat_id}', {'chat_id': chat_id}, ChatMessageListView,
+             AsyncChatMessageListView),
+        ]
+
+        for name, url, kwargs, sync_view, async_view in endpoints:
+            sync_handler = sync_to_async(sync_view.as_view(), thread_sensitive=False)
+            async_handler = async_view.as_view()
+
+            sync_rate = async_to_sync(self.measure)(
+                lambda: sync_handler(RequestFactory().get(url, query, headers=headers), **kwargs),
+                options['requests'], options['concurrency']
+            )
+            async_rate = async_to_sync(self.measure)(
+                lambda: async_handler(AsyncRequestFactory().get(url, query, headers=headers), **kwargs),
+                options['requests'], options['concurrency']
+            )
+            self.stdout.write(
+                f'{name}: sync {sync_rate:.1f} req/s, async {async_rate:.1f} req/s '
+                f'({async_rate / sync_rate:.2f}x)'
+            )
+
+    async def measure(self, call, requests, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send():
+            async with semaphore:
+                response = await call()
+                if response.status_code != 200:
+                    raise CommandError(f"Request failed with status {response.status_code}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.6 on 2024-06-16 14:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_inbox(apps, schema_editor):
+    Chat = apps.get_model('messenger', 'Chat')
+    ChatMember = apps.get_model('messenger', 'ChatMember')
+
+    peers = ChatMember.objects.filter(chat_id=OuterRef('chat_id')).exclude(id=OuterRef('id')).order_by('id')
+    chats = Chat.objects.filter(id=OuterRef('chat_id'))
+    ChatMember.objects.update(
+        peer_id=Subquery(peers.values('user_id')[:1]),
+        last_message_id=Subquery(chats.values('last_message_id')[:1]),
+        last_message_date=Subquery(chats.values('last_message__date')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messenger', '0002_chat_last_message'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmember',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messenger.chatmessage'),
+        ),
+        migrations.AddField(
+            model_name='chatmember',
+            name='last_message_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatmember',
+            name='peer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='chatmember',
+            name='unread_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='chatmember',
+            index=models.Index(fields=['user', '-last_message_date'], name='messenger_c_user_id_953407_idx'),
+        ),
+        migrations.RunPython(fill_inbox, migrations.RunPython.noop),
+    ]
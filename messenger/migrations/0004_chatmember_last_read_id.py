@@ -0,0 +1,25 @@
+# Generated by Django 5.0.6 on 2024-06-17 10:32
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_last_read_id(apps, schema_editor):
+    ChatMember = apps.get_model('messenger', 'ChatMember')
+    ChatMember.objects.update(last_read_id=Coalesce(models.F('last_message_id'), 0), unread_count=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messenger', '0003_chatmember_last_message_chatmember_last_message_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmember',
+            name='last_read_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_last_read_id, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Case, When
 
 from core.models import User
 
@@ -8,13 +9,25 @@ class Chat(models.Model):
 
     def update_last_message(self, message):
         self.last_message = message
-        self.save()
+        Chat.objects.filter(id=self.id).update(last_message=message)
+        ChatMember.objects.filter(chat_id=self.id).update(
+            last_message=message,
+            last_message_date=message.date if message else None
+        )
 
 
 class ChatMember(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=['user', '-last_message_date'])]
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE)
     chat_name = models.CharField(max_length=100)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    peer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message = models.ForeignKey('ChatMessage', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='+')
+    last_message_date = models.DateTimeField(null=True, blank=True)
+    unread_count = models.IntegerField(default=0)
+    last_read_id = models.BigIntegerField(default=0)
 
 
 class ChatMessage(models.Model):
@@ -23,11 +36,29 @@ class ChatMessage(models.Model):
     date = models.DateTimeField()
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.chat_member.chat.update_last_message(self)
+        if self.pk is not None:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Chat.objects.filter(id=self.chat_member.chat_id).update(last_message=self)
+            ChatMember.objects.filter(chat_id=self.chat_member.chat_id).update(
+                last_message=self,
+                last_message_date=self.date,
+                unread_count=Case(When(id=self.chat_member_id, then=0), default=F('unread_count') + 1),
+                last_read_id=Case(When(id=self.chat_member_id, then=self.id), default=F('last_read_id'),
+                                  output_field=models.BigIntegerField())
+            )
 
     def delete(self, *args, **kwargs):
         chat = self.chat_member.chat
-        super().delete(*args, **kwargs)
-        last_message = ChatMessage.objects.filter(chat_member__chat=chat).order_by('-id').first()
-        chat.update_last_message(last_message)
+        message_id = self.id
+        with transaction.atomic():
+            ChatMember.objects.filter(chat=chat, last_read_id__lt=message_id, unread_count__gt=0).exclude(
+                id=self.chat_member_id
+            ).update(unread_count=F('unread_count') - 1)
+            result = super().delete(*args, **kwargs)
+            if chat.last_message_id in (message_id, None):
+                last_message = ChatMessage.objects.filter(chat_member__chat=chat).order_by('-id').first()
+                chat.update_last_message(last_message)
+        return result
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from messenger.models import ChatMember, ChatMessage
+
+
+def mark_read(user, positions):
+    with transaction.atomic():
+        members = {
+            member.chat_id: member
+            for member in ChatMember.objects.select_for_update(of=('self',))
+            .filter(user=user, chat_id__in=positions.keys()).select_related('chat').order_by('chat_id')
+        }
+        if len(members) != len(positions):
+            raise ChatMember.DoesNotExist("Chat was not found")
+
+        updated = []
+        for chat_id, message_id in positions.items():
+            member = members[chat_id]
+            last_message_id = member.chat.last_message_id or 0
+            last_read_id = min(message_id, last_message_id) if message_id is not None else last_message_id
+            if last_read_id > member.last_read_id:
+                member.last_read_id = last_read_id
+                updated.append(member)
+
+        if updated:
+            unread_messages = ChatMessage.objects.filter(
+                chat_member__chat_id=OuterRef('chat_id'),
+                id__gt=OuterRef('last_read_id')
+            ).exclude(chat_member_id=OuterRef('id')).order_by().values('chat_member__chat_id')
+            ChatMember.objects.bulk_update(updated, ['last_read_id'])
+            ChatMember.objects.filter(id__in=[member.id for member in updated]).update(
+                unread_count=Coalesce(Subquery(unread_messages.annotate(total=Count('id')).values('total')), 0)
+            )
+
+    return updated
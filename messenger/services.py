@@ -0,0 +1,81 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils import timezone
+
+from core.pagination import aget_cursor_page
+from core.rows import ChatMessageRowSerializer
+from messenger.models import Chat, ChatMember, ChatMessage
+
+
+def save_message(sender, recipient, text):
+    chat = Chat.objects.filter(chatmember__user=sender).filter(chatmember__user=recipient).first()
+
+    created = chat is None
+    with transaction.atomic():
+        if created:
+            chat = Chat.objects.create()
+            ChatMember.objects.create(chat=chat, user=sender, chat_name=recipient.login, peer=recipient)
+            ChatMember.objects.create(chat=chat, user=recipient, chat_name=sender.login, peer=sender)
+
+        chat_member = ChatMember.objects.select_related('user').get(chat=chat, user=sender)
+        message = ChatMessage.objects.create(date=timezone.now(), text=text, chat_member=chat_member)
+
+    return message, created
+
+
+async def get_page(queryset, page_number, per_page):
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    try:
+        page_obj = paginator.page(page_number)
+    except:
+        page_obj = paginator.page(1)
+    page_obj.object_list = [item async for item in page_obj.object_list]
+    return page_obj, paginator
+
+
+def get_user_chats(user):
+    return ChatMember.objects.filter(user=user).select_related(
+        'peer', 'last_message__chat_member__user'
+    ).order_by('-last_message_date', '-id')
+
+
+def get_chat_messages(chat_id):
+    return ChatMessageRowSerializer.project(ChatMessage.objects.filter(chat_member__chat_id=chat_id).order_by('id'))
+
+
+async def get_chat_page(user, page_number, per_page):
+    return await get_page(get_user_chats(user), page_number, per_page)
+
+
+async def get_message_page(chat_id, page_number, per_page):
+    return await get_page(get_chat_messages(chat_id), page_number, per_page)
+
+
+async def get_message_cursor_page(chat_id, query_params, per_page):
+    return await aget_cursor_page(get_chat_messages(chat_id), query_params, per_page)
+
+
+async def chat_exists(chat_id):
+    return await Chat.objects.filter(id=chat_id).aexists()
+
+
+async def create_message(sender, recipient, text):
+    return await sync_to_async(save_message)(sender, recipient, text)
+
+
+async def get_user_message(user, message_id):
+    return await ChatMessage.objects.select_related('chat_member__user').aget(id=message_id, chat_member__user=user)
+
+
+async def update_message(message, text):
+    message.text = text
+    await message.asave(update_fields=['text'])
+    return message
+
+
+async def delete_message(message):
+    chat_id = message.chat_member.chat_id
+    await message.adelete()
+    return chat_id
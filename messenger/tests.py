@@ -1,3 +1,505 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.exceptions import ChannelFull
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import JsonResponse
+from django.test import SimpleTestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User
+from core.response import FastJsonResponse
+from core.rows import ChatMessageRowSerializer
+from messenger.layers import SQLiteChannelLayer
+from messenger.models import ChatMember, ChatMessage
+from messenger.read_state import mark_read
+from messenger.serializers import ChatMessageGetSerializer
+from messenger.services import save_message
+from messenger.token_auth import JWTAuthMiddleware, get_token_user
+from messenger.websockets import ChatMessageConsumer
+
+
+class MessengerTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = self.create_user('owner')
+        self.peers = [self.create_user(f'peer{index}') for index in range(3)]
+        self.client = self.get_client(self.user)
+
+    def create_user(self, login):
+        return User.objects.create(login=login, is_active=True)
+
+    def get_client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def send(self, client, recipient, text):
+        response = client.post('/api/messages/', {'recipient_id': str(recipient.id), 'text': text}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['model']
+
+    def get_chats(self, client=None):
+        response = (client or self.client).get('/api/chats/', {'pageNumber': 1, 'pageSize': 10})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['model']
+
+
+class ChatInboxTest(MessengerTestCase):
+    def setUp(self):
+        super().setUp()
+        for peer in self.peers:
+            self.send(self.client, peer, f'hi {peer.login}')
+        peer_client = self.get_client(self.peers[0])
+        self.send(peer_client, self.user, 'reply1')
+        self.send(peer_client, self.user, 'reply2')
+
+    def test_chats_are_ordered_by_last_message(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/chats/', {'pageNumber': 1, 'pageSize': 10})
+        chats = response.json()['model']
+        self.assertEqual([chat['info']['user_name'] for chat in chats], ['peer0', 'peer2', 'peer1'])
+        self.assertEqual(chats[0]['last_message']['text'], 'reply2')
+        self.assertEqual([chat['unread_count'] for chat in chats], [2, 0, 0])
+
+    def test_new_chat_creates_both_members(self):
+        chat_member = ChatMember.objects.get(user=self.peers[1])
+        self.assertEqual(chat_member.chat_name, 'owner')
+        self.assertEqual(chat_member.peer_id, str(self.user.id))
+        self.assertEqual(chat_member.unread_count, 1)
+
+    def test_deleting_last_message_restores_previous(self):
+        ChatMessage.objects.get(text='reply2').delete()
+        self.assertEqual(self.get_chats()[0]['last_message']['text'], 'reply1')
+
+    def test_editing_older_message_keeps_last_message(self):
+        message = ChatMessage.objects.get(text='hi peer1')
+        message.text = 'edited'
+        message.save()
+        chats = self.get_chats()
+        self.assertEqual(chats[0]['last_message']['text'], 'reply2')
+        self.assertEqual(chats[2]['last_message']['text'], 'edited')
+
+
+class ChatReadStateTest(MessengerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.peer = self.peers[0]
+        self.send(self.client, self.peer, 'hello')
+        peer_client = self.get_client(self.peer)
+        self.message_ids = [self.send(peer_client, self.user, f'reply{index}')['id'] for index in range(4)]
+        self.member = ChatMember.objects.get(user=self.user)
+
+    def mark_read(self, chats):
+        with mock.patch('messenger.views.send_message') as send_message:
+            response = self.client.post('/api/chats/read/', {'chats': chats}, format='json')
+        self.member.refresh_from_db()
+        return response, send_message
+
+    def test_sender_reads_own_message(self):
+        self.assertEqual(self.member.unread_count, 4)
+        self.assertEqual(self.member.last_read_id, ChatMessage.objects.get(text='hello').id)
+
+    def test_mark_read_up_to_message(self):
+        response, send_message = self.mark_read([{'chat_id': self.member.chat_id, 'message_id': self.message_ids[1]}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.member.unread_count, self.member.last_read_id), (2, self.message_ids[1]))
+        send_message.assert_called_once_with('message.read', {
+            'chat_id': self.member.chat_id, 'user_id': str(self.user.id), 'last_read_id': self.message_ids[1]
+        }, self.member.chat_id)
+
+    def test_mark_whole_chat_read(self):
+        self.mark_read([{'chat_id': self.member.chat_id}])
+        self.assertEqual((self.member.unread_count, self.member.last_read_id), (0, self.message_ids[-1]))
+
+    def test_future_message_id_is_clamped(self):
+        self.mark_read([{'chat_id': self.member.chat_id, 'message_id': self.message_ids[-1] + 1000}])
+        self.assertEqual(self.member.last_read_id, self.message_ids[-1])
+
+        self.send(self.get_client(self.peer), self.user, 'later')
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.unread_count, 1)
+
+    def test_read_position_never_moves_back(self):
+        self.mark_read([{'chat_id': self.member.chat_id}])
+        response, _ = self.mark_read([{'chat_id': self.member.chat_id, 'message_id': self.message_ids[0]}])
+        self.assertEqual(response.json()['model'], [])
+        self.assertEqual(self.member.last_read_id, self.message_ids[-1])
+
+    @skipUnlessDBFeature('has_select_for_update_of')
+    def test_member_rows_are_locked(self):
+        with CaptureQueriesContext(connection) as queries:
+            mark_read(self.user, {self.member.chat_id: self.message_ids[1]})
+        select_sql = next(query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT'))
+        self.assertIn('FOR UPDATE OF', select_sql)
+
+    def test_deleting_unread_message(self):
+        self.mark_read([{'chat_id': self.member.chat_id, 'message_id': self.message_ids[1]}])
+        ChatMessage.objects.get(id=self.message_ids[3]).delete()
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.unread_count, 1)
+        ChatMessage.objects.get(id=self.message_ids[0]).delete()
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.unread_count, 1)
+
+    def test_unknown_chat(self):
+        response, _ = self.mark_read([{'chat_id': 999}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], 'Chat was not found')
+
+
+class SQLiteChannelLayerTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'channels.sqlite3')
+        self.layer = self.create_layer()
+
+    def create_layer(self, **kwargs):
+        layer = SQLiteChannelLayer(self.path, poll_interval=0.01, **kwargs)
+        self.addCleanup(layer.connection.close)
+        return layer
+
+    async def test_send_and_receive(self):
+        connection = self.layer.connection
+        channel = await self.layer.new_channel()
+        await self.layer.send(channel, {'type': 'first'})
+        await self.layer.send(channel, {'type': 'second'})
+        self.assertEqual(await self.layer.receive(channel), {'type': 'first'})
+        self.assertEqual(await self.layer.receive(channel), {'type': 'second'})
+        self.assertIs(self.layer.connection, connection)
+
+    async def test_receive_waits_for_message(self):
+        channel = await self.layer.new_channel()
+        receive = asyncio.ensure_future(self.layer.receive(channel))
+        await asyncio.sleep(0.05)
+        self.assertFalse(receive.done())
+        await self.create_layer().send(channel, {'type': 'late'})
+        self.assertEqual(await asyncio.wait_for(receive, 1), {'type': 'late'})
+
+    async def test_groups_are_shared_between_layers(self):
+        other_layer = self.create_layer()
+        first = await self.layer.new_channel()
+        second = await other_layer.new_channel()
+        await self.layer.group_add('chats_1', first)
+        await other_layer.group_add('chats_1', second)
+
+        await other_layer.group_send('chats_1', {'type': 'message.send'})
+        self.assertEqual(await self.layer.receive(first), {'type': 'message.send'})
+        self.assertEqual(await other_layer.receive(second), {'type': 'message.send'})
+
+        await self.layer.group_discard('chats_1', first)
+        await self.layer.group_send('chats_1', {'type': 'message.delete'})
+        self.assertEqual(await other_layer.receive(second), {'type': 'message.delete'})
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(self.layer.receive(first), 0.1)
+
+    async def test_capacity(self):
+        layer = self.create_layer(capacity=2)
+        await layer.send('channel', {'number': 1})
+        await layer.send('channel', {'number': 2})
+        with self.assertRaises(ChannelFull):
+            await layer.send('channel', {'number': 3})
+        self.assertEqual(await layer.receive('channel'), {'number': 1})
+        await layer.send('channel', {'number': 3})
+
+    async def test_expiry(self):
+        layer = self.create_layer(expiry=10, group_expiry=100)
+        channel = await layer.new_channel()
+        await layer.group_add('chats_1', channel)
+        await layer.send(channel, {'type': 'expired'})
+
+        with mock.patch('messenger.layers.time.time', return_value=time.time() + 50):
+            await layer.group_send('chats_1', {'type': 'fresh'})
+            self.assertEqual(await layer.receive(channel), {'type': 'fresh'})
+
+        with mock.patch('messenger.layers.time.time', return_value=time.time() + 200):
+            await layer.group_send('chats_1', {'type': 'dropped'})
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(layer.receive(channel), 0.1)
+
+    async def test_flush(self):
+        channel = await self.layer.new_channel()
+        await self.layer.group_add('chats_1', channel)
+        await self.layer.send(channel, {'type': 'message'})
+        await self.layer.flush()
+        await self.layer.group_send('chats_1', {'type': 'message'})
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(self.layer.receive(channel), 0.1)
+
+
+class AsyncMessengerViewTest(MessengerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.peer = self.peers[0]
+
+    def test_authentication_is_required(self):
+        response = APIClient().get('/api/chats/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIsNone(response.json()['model'])
+
+        inactive_user = User.objects.create(login='inactive')
+        response = self.get_client(inactive_user).get('/api/chats/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_send_json_message(self):
+        message = self.send(self.client, self.peer, 'hello')
+        self.assertEqual(message['text'], 'hello')
+        self.assertEqual(message['info']['sender_name'], 'owner')
+
+    def test_send_form_message(self):
+        response = self.client.post('/api/messages/', {'recipient_id': str(self.peer.id), 'text': 'multipart'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/messages/', f'recipient_id={self.peer.id}&text=urlencoded',
+                                    content_type='application/x-www-form-urlencoded')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(ChatMessage.objects.order_by('id').values_list('text', flat=True)),
+                         ['multipart', 'urlencoded'])
+
+    def test_body_must_be_an_object(self):
+        for body in (['text'], 'text', 5):
+            response = self.client.post('/api/messages/', body, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['errors'], 'Request body should be a JSON object or form data')
+
+        response = self.client.post('/api/messages/', b'{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_recipient(self):
+        response = self.client.post('/api/messages/', {'recipient_id': 'missing', 'text': 'hello'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], 'Message recipient was not found')
+
+    def test_update_and_delete_message(self):
+        message = self.send(self.client, self.peer, 'hello')
+        with mock.patch('messenger.async_views.send_message') as send_message:
+            response = self.client.put(f"/api/messages/{message['id']}", {'text': 'edited'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['model']['text'], 'edited')
+
+            response = self.client.delete(f"/api/messages/{message['id']}")
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual([call.args[0] for call in send_message.call_args_list], ['message.update', 'message.delete'])
+        self.assertFalse(ChatMessage.objects.exists())
+
+    def test_only_sender_can_change_message(self):
+        message = self.send(self.client, self.peer, 'hello')
+        peer_client = self.get_client(self.peer)
+        response = peer_client.put(f"/api/messages/{message['id']}", {'text': 'edited'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], 'Message was not found')
+        response = peer_client.delete(f"/api/messages/{message['id']}")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ChatMessage.objects.get(id=message['id']).text, 'hello')
+
+    def test_message_pages(self):
+        messages = [self.send(self.client, self.peer, f'message{index}') for index in range(5)]
+        chat_id = messages[0]['info']['chat_id']
+
+        response = self.client.get(f'/api/messages/list/{chat_id}', {'pageNumber': 2, 'pageSize': 2})
+        self.assertEqual([message['text'] for message in response.json()['model']], ['message2', 'message3'])
+        self.assertEqual(response.json()['total_items'], 5)
+
+        response = self.client.get(f'/api/messages/list/{chat_id}',
+                                   {'pagination': 'cursor', 'pageSize': 2, 'after_id': messages[2]['id']})
+        self.assertEqual(response.json()['model'], messages[3:])
+
+        response = self.client.get('/api/messages/list/999')
+        self.assertEqual(response.status_code, 400)
+
+
+class ChatMessageConsumerTest(MessengerTestCase):
+    application = URLRouter([path('ws/chats/', ChatMessageConsumer.as_asgi())])
+
+    def setUp(self):
+        super().setUp()
+        self.peer = self.peers[0]
+        save_message(self.peer, self.user, 'seed')
+        self.chat_id = ChatMember.objects.get(user=self.user).chat_id
+
+    def get_communicator(self, user):
+        communicator = WebsocketCommunicator(self.application, '/ws/chats/')
+        if user is not None:
+            communicator.scope['user'] = user
+        return communicator
+
+    def run_sockets(self, scenario, *users):
+        async def run():
+            communicators = [self.get_communicator(user) for user in users]
+            for communicator in communicators:
+                connected, _ = await communicator.connect()
+                self.assertTrue(connected)
+            try:
+                await scenario(*communicators)
+            finally:
+                for communicator in communicators:
+                    await communicator.disconnect()
+
+        async_to_sync(run)()
+
+    async def receive_types(self, communicator, count):
+        return sorted([(await communicator.receive_json_from())['type'] for _ in range(count)])
+
+    def test_anonymous_socket_is_rejected(self):
+        async def run():
+            for user in (None, AnonymousUser()):
+                connected, _ = await self.get_communicator(user).connect()
+                self.assertFalse(connected)
+
+        async_to_sync(run)()
+
+    def test_invalid_frames(self):
+        async def scenario(socket):
+            await socket.send_to('not json')
+            self.assertEqual(await socket.receive_json_from(), {
+                'type': 'ack', 'request_id': None, 'model': None, 'message': None,
+                'errors': 'Frame should be a valid JSON object'
+            })
+            await socket.send_json_to({'action': 'fly', 'request_id': 'r1'})
+            ack = await socket.receive_json_from()
+            self.assertEqual((ack['request_id'], ack['errors']), ('r1', 'Unknown action'))
+
+        self.run_sockets(scenario, self.user)
+
+    def test_send_edit_and_delete(self):
+        async def scenario(owner, peer):
+            await owner.send_json_to({'action': 'send', 'request_id': 'r1', 'recipient_id': str(self.peer.id),
+                                      'text': 'hello'})
+            frames = [await owner.receive_json_from() for _ in range(2)]
+            ack = next(frame for frame in frames if frame['type'] == 'ack')
+            self.assertEqual(ack['request_id'], 'r1')
+            self.assertEqual((await peer.receive_json_from())['data']['text'], 'hello')
+            message_id = ack['model']['id']
+
+            await peer.send_json_to({'action': 'edit', 'request_id': 'r2', 'id': message_id, 'text': 'hijack'})
+            self.assertEqual((await peer.receive_json_from())['errors'], 'Message was not found')
+
+            await owner.send_json_to({'action': 'edit', 'request_id': 'r3', 'id': message_id, 'text': 'x' * 600})
+            self.assertIn('text', (await owner.receive_json_from())['errors'])
+
+            await owner.send_json_to({'action': 'edit', 'request_id': 'r4', 'id': message_id, 'text': 'edited'})
+            self.assertEqual(await self.receive_types(owner, 2), ['ack', 'message.update'])
+            self.assertEqual((await peer.receive_json_from())['data']['text'], 'edited')
+
+            await owner.send_json_to({'action': 'delete', 'request_id': 'r5', 'id': message_id})
+            self.assertEqual(await self.receive_types(owner, 2), ['ack', 'message.delete'])
+            self.assertEqual(await peer.receive_json_from(), {'type': 'message.delete', 'data': message_id})
+
+        self.run_sockets(scenario, self.user, self.peer)
+        self.assertEqual(list(ChatMessage.objects.values_list('text', flat=True)), ['seed'])
+
+    def test_typing_is_not_echoed(self):
+        async def scenario(owner, peer):
+            await owner.send_json_to({'action': 'typing', 'request_id': 'r1', 'chat_id': self.chat_id})
+            self.assertEqual((await owner.receive_json_from())['type'], 'ack')
+            self.assertEqual(await peer.receive_json_from(), {
+                'type': 'message.typing', 'data': {'chat_id': self.chat_id, 'user_id': str(self.user.id)}
+            })
+            self.assertTrue(await owner.receive_nothing())
+
+            await owner.send_json_to({'action': 'typing', 'request_id': 'r2', 'chat_id': 999})
+            self.assertEqual((await owner.receive_json_from())['errors'], 'Chat was not found')
+
+        self.run_sockets(scenario, self.user, self.peer)
+
+    def test_new_chat_reaches_every_open_socket(self):
+        recipient = self.peers[1]
+
+        async def scenario(owner, other_owner, first, second):
+            await owner.send_json_to({'action': 'send', 'request_id': 'r1', 'recipient_id': str(recipient.id),
+                                      'text': 'new chat'})
+            frames = [await owner.receive_json_from() for _ in range(2)]
+            self.assertEqual(sorted(frame['type'] for frame in frames), ['ack', 'message.send'])
+            for socket in (other_owner, first, second):
+                self.assertEqual((await socket.receive_json_from())['data']['text'], 'new chat')
+            chat_id = frames[0]['data' if frames[0]['type'] == 'message.send' else 'model']['info']['chat_id']
+
+            await second.send_json_to({'action': 'typing', 'request_id': 'r2', 'chat_id': chat_id})
+            self.assertEqual((await second.receive_json_from())['type'], 'ack')
+            for socket in (owner, other_owner):
+                self.assertEqual((await socket.receive_json_from())['type'], 'message.typing')
+            self.assertTrue(await first.receive_nothing())
+
+        self.run_sockets(scenario, self.user, self.user, recipient, recipient)
+
+    def test_new_chat_from_http_reaches_recipient_socket(self):
+        recipient = self.peers[1]
+
+        async def scenario(socket):
+            response = await sync_to_async(self.client.post)(
+                '/api/messages/', {'recipient_id': str(recipient.id), 'text': 'over http'}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((await socket.receive_json_from())['data']['text'], 'over http')
+
+        self.run_sockets(scenario, recipient)
+
+
+class TokenUserTest(MessengerTestCase):
+    def get_users(self, tokens):
+        async def load():
+            return await asyncio.gather(*(get_token_user(token) for token in tokens))
+
+        return async_to_sync(load)()
+
+    def test_concurrent_tokens_are_loaded_in_one_query(self):
+        users = [self.user, *self.peers]
+        tokens = [str(AccessToken.for_user(users[index % len(users)])) for index in range(20)]
+        with self.assertNumQueries(1):
+            loaded = self.get_users(tokens)
+        self.assertEqual([user.login for user in loaded[:4]], ['owner', 'peer0', 'peer1', 'peer2'])
+        self.assertEqual(loaded[0].pk, str(self.user.id))
+        self.assertTrue(loaded[0].is_authenticated)
+        self.assertFalse(loaded[0]._state.adding)
+
+    def test_user_is_cached_by_token(self):
+        token = str(AccessToken.for_user(self.user))
+        self.get_users([token])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_users([token])[0].login, 'owner')
+
+    def test_invalid_and_inactive_tokens(self):
+        inactive_user = User.objects.create(login='inactive')
+        with self.assertNumQueries(1):
+            loaded = self.get_users([str(AccessToken.for_user(inactive_user)), 'invalid'])
+        self.assertEqual(loaded, [None, None])
+
+    def test_middleware_sets_scope_user(self):
+        async def authenticate(header):
+            scope = {'type': 'websocket', 'headers': [(b'authorization', header)] if header else []}
+
+            async def application(scope, receive, send):
+                pass
+
+            await JWTAuthMiddleware(application)(scope, None, None)
+            return scope
+
+        scope = async_to_sync(authenticate)(f'Bearer {AccessToken.for_user(self.user)}'.encode())
+        self.assertEqual(scope['user'].login, 'owner')
+        self.assertEqual(async_to_sync(authenticate)(b'Bearer invalid')['error'], 'Invalid token')
+        self.assertEqual(async_to_sync(authenticate)(None)['error'], 'Please, provide an auth token')
+
+
+class ChatMessageRowTest(MessengerTestCase):
+    def test_rows_match_serializer(self):
+        self.send(self.client, self.peers[0], 'hi')
+        self.send(self.get_client(self.peers[0]), self.user, 'reply')
+        messages = ChatMessage.objects.select_related('chat_member__user').order_by('id')
+
+        rows = ChatMessageRowSerializer(ChatMessageRowSerializer.project(messages)).data
+        self.assertEqual(json.loads(FastJsonResponse(rows).content),
+                         json.loads(JsonResponse(ChatMessageGetSerializer(messages, many=True).data, safe=False).content))
+        self.assertEqual(rows[1]['info']['sender_name'], 'peer0')
+        self.assertTrue(rows[0]['date'].endswith('Z'))
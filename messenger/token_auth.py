@@ -1,8 +1,17 @@
+import asyncio
+import time
+
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken
 
 from core.models import User
+from ticket_sales_backend import settings
+
+USER_SNAPSHOT_FIELDS = ['id', 'login', 'is_active', 'is_staff', 'is_superuser']
 
 
 class JWTAuthMiddleware(BaseMiddleware):
@@ -11,9 +20,9 @@ class JWTAuthMiddleware(BaseMiddleware):
         token = self.get_token_from_scope(scope)
 
         if token is not None:
-            user_id = await self.get_user_from_token(token)
-            if user_id:
-                scope['user'] = await User.objects.aget(id=user_id)
+            user = await get_token_user(token)
+            if user is not None:
+                scope['user'] = user
             else:
                 scope['error'] = 'Invalid token'
 
@@ -24,17 +33,88 @@ class JWTAuthMiddleware(BaseMiddleware):
 
     def get_token_from_scope(self, scope):
         headers = dict(scope.get('headers', []))
-        auth_header = headers.get(b'authorization', b'').decode('utf-8')
+        return get_bearer_token(headers.get(b'authorization', b'').decode('utf-8'))
 
-        if auth_header.startswith('Bearer '):
-            return auth_header.split(' ')[1]
-        else:
-            return None
 
-    @database_sync_to_async
-    def get_user_from_token(self, token):
+class UserSnapshotLoader:
+    def __init__(self):
+        self.waiting = {}
+        self.loading = {}
+
+    async def load(self, user_id):
+        future = self.loading.get(user_id) or self.waiting.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self.waiting:
+                loop.call_later(settings.JWT_USER_BATCH_WINDOW, self.schedule_flush)
+            future = self.waiting[user_id] = loop.create_future()
+        return await asyncio.shield(future)
+
+    def schedule_flush(self):
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        batch, self.waiting = self.waiting, {}
+        self.loading.update(batch)
         try:
-            access_token = AccessToken(token)
-            return access_token['user_id']
-        except:
+            snapshots = await get_user_snapshots(list(batch))
+        except Exception as error:
+            for future in batch.values():
+                future.set_exception(error)
+        else:
+            for user_id, future in batch.items():
+                future.set_result(snapshots.get(user_id))
+        finally:
+            for user_id in batch:
+                self.loading.pop(user_id, None)
+
+
+user_snapshot_loader = UserSnapshotLoader()
+
+
+@database_sync_to_async
+def get_user_snapshots(user_ids):
+    users = User.objects.filter(id__in=user_ids, is_active=True).values(*USER_SNAPSHOT_FIELDS)
+    return {user['id']: user for user in users}
+
+
+def get_user_snapshot_key(jti):
+    return f'jwt_user_snapshot_{jti}'
+
+
+async def get_token_user(token):
+    try:
+        access_token = AccessToken(token)
+    except TokenError:
+        return None
+
+    key = get_user_snapshot_key(access_token['jti'])
+    snapshot = await cache.aget(key)
+    if snapshot is None:
+        snapshot = await user_snapshot_loader.load(access_token['user_id'])
+        if snapshot is None:
             return None
+
+        timeout = min(access_token['exp'] - int(time.time()), settings.JWT_USER_CACHE_TIMEOUT)
+        if timeout > 0:
+            await cache.aset(key, snapshot, timeout)
+
+    return get_snapshot_user(snapshot)
+
+
+def get_snapshot_user(snapshot):
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in snapshot]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [snapshot[field_name] for field_name in field_names])
+
+
+def get_bearer_token(auth_header):
+    if auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+
+async def get_request_user(request):
+    token = get_bearer_token(request.headers.get('Authorization', ''))
+    if token is None:
+        return None
+    return await get_token_user(token)
@@ -3,11 +3,13 @@ from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
-from core.models import User
-from core.response import Response, PageResponse
-from messenger.models import Chat, ChatMessage
-from messenger.serializers import ChatMessageGetSerializer, ChatMessageUpdateSerializer, ChatMessageCreateSerializer, \
-    ChatGetSerializer
+from core.pagination import is_cursor_pagination, get_cursor_page
+from core.response import Response, PageResponse, CursorPageResponse, FastJsonResponse
+from core.rows import ChatMessageRowSerializer
+from messenger.models import Chat, ChatMember
+from messenger.read_state import mark_read
+from messenger.services import get_user_chats, get_chat_messages
+from messenger.serializers import ChatGetSerializer, ChatReadSerializer
 from messenger.websockets import send_message
 
 
@@ -15,7 +17,7 @@ class ChatListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user_chats = Chat.objects.filter(chatmember__user=request.user).order_by('-last_message__date').distinct()
+        user_chats = get_user_chats(request.user)
 
         page_number = request.query_params.get("pageNumber")
         per_page = request.query_params.get("pageSize")
@@ -36,6 +38,33 @@ class ChatListView(APIView):
         return JsonResponse(response.to_dict(), status=200)
 
 
+class ChatReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = ChatReadSerializer(data=request.data.get('chats', []), many=True)
+        if not serializer.is_valid():
+            response = Response(errors=serializer.errors)
+            return JsonResponse(response.to_dict(), status=400)
+
+        positions = {item['chat_id']: item.get('message_id') for item in serializer.validated_data}
+        try:
+            members = mark_read(request.user, positions)
+        except ChatMember.DoesNotExist:
+            response = Response(errors="Chat was not found")
+            return JsonResponse(response.to_dict(), status=400)
+
+        receipts = [
+            {'chat_id': member.chat_id, 'user_id': str(request.user.id), 'last_read_id': member.last_read_id}
+            for member in members
+        ]
+        for receipt in receipts:
+            send_message('message.read', receipt, receipt['chat_id'])
+
+        response = Response(model=receipts, message="Chats were marked as read successfully")
+        return JsonResponse(response.to_dict(), status=200)
+
+
 class ChatMessageListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -46,7 +75,17 @@ class ChatMessageListView(APIView):
             response = Response(errors="Chat was not found")
             return JsonResponse(response.to_dict(), status=400)
 
-        messages = ChatMessage.objects.filter(chat_member__chat_id=chat_id).order_by("id")
+        messages = get_chat_messages(chat_id)
+
+        if is_cursor_pagination(request):
+            page = get_cursor_page(messages, request.query_params, request.query_params.get("pageSize"))
+            serializer = ChatMessageRowSerializer(page.object_list)
+            response = CursorPageResponse(
+                model=serializer.data,
+                message="Page of chat messages was retrieved successfully",
+                page=page
+            )
+            return FastJsonResponse(response.to_dict(), status=200)
 
         page_number = request.query_params.get("pageNumber")
         per_page = request.query_params.get("pageSize")
@@ -56,7 +95,7 @@ class ChatMessageListView(APIView):
         except:
             page_obj = paginator.page(1)
 
-        serializer = ChatMessageGetSerializer(page_obj.object_list, many=True)
+        serializer = ChatMessageRowSerializer(page_obj.object_list)
 
         response = PageResponse(
             model=serializer.data,
@@ -64,63 +103,4 @@ class ChatMessageListView(APIView):
             page_obj=page_obj,
             paginator=paginator
         )
-        return JsonResponse(response.to_dict(), status=200)
-
-
-class ChatMessageView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def post(self, request):
-        try:
-            User.objects.get(id=request.data["recipient_id"])
-        except User.DoesNotExist:
-            response = Response(errors="Message recipient was not found")
-            return JsonResponse(response.to_dict(), status=400)
-
-        serializer = ChatMessageCreateSerializer(data=request.data, context={'request': request})
-        if serializer.is_valid():
-            message = serializer.save()
-            serializer = ChatMessageGetSerializer(message)
-
-            send_message('message.send', serializer.data, serializer.data['info']['chat_id'])
-
-            response = Response(model=serializer.data, message="Message was created successfully")
-            return JsonResponse(response.to_dict(), status=200)
-
-        response = Response(errors=serializer.errors)
-        return JsonResponse(response.to_dict(), status=400)
-
-    def put(self, request, id):
-        try:
-            message = ChatMessage.objects.get(id=id)
-        except ChatMessage.DoesNotExist:
-            response = Response(errors="Message was not found")
-            return JsonResponse(response.to_dict(), status=400)
-
-        serializer = ChatMessageUpdateSerializer(message, data=request.data)
-        if serializer.is_valid():
-            message = serializer.save()
-            serializer = ChatMessageGetSerializer(message)
-
-            send_message('message.update', serializer.data, serializer.data['info']['chat_id'])
-
-            response = Response(model=serializer.data, message="Message info was updated successfully")
-            return JsonResponse(response.to_dict(), status=200)
-
-        response = Response(errors=serializer.errors)
-        return JsonResponse(response.to_dict(), status=400)
-
-    def delete(self, request, id):
-        try:
-            message = ChatMessage.objects.get(id=id)
-            chat_id = message.chat_member.chat_id
-        except ChatMessage.DoesNotExist:
-            response = Response(errors="Message was not found")
-            return JsonResponse(response.to_dict(), status=400)
-
-        message.delete()
-
-        send_message('message.delete', id, chat_id)
-
-        response = Response(message="Message was deleted successfully")
-        return JsonResponse(response.to_dict(), status=204)
+        return FastJsonResponse(response.to_dict(), status=200)
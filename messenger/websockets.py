@@ -1,25 +1,133 @@
 import json
 
-from asgiref.sync import async_to_sync
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.layers import get_channel_layer
+from django.core.exceptions import ValidationError
 
-from messenger.models import Chat
+from core.models import User
+from core.outbox import bind_dispatcher, publish
+from core.response import Response
+from messenger import services
+from messenger.models import Chat, ChatMessage
+from messenger.serializers import ChatMessageGetSerializer, ChatMessageUpdateSerializer
 
 
 class ChatMessageConsumer(AsyncWebsocketConsumer):
+    actions = {
+        'send': 'send_chat_message',
+        'edit': 'edit_chat_message',
+        'delete': 'delete_chat_message',
+        'typing': 'send_typing',
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(args, kwargs)
+        self.user_id = None
         self.chat_ids = []
 
     async def connect(self):
-        self.chat_ids = await get_chat_ids(self.scope['user'].id)
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        bind_dispatcher()
+        self.user_id = str(user.id)
+        self.chat_ids = await get_chat_ids(self.user_id)
 
+        await self.channel_layer.group_add(get_user_key(self.user_id), self.channel_name)
         for chat_id in self.chat_ids:
             await self.channel_layer.group_add(get_chat_key(chat_id), self.channel_name)
         await super().connect()
 
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            frame = json.loads(text_data)
+        except (TypeError, ValueError):
+            frame = None
+
+        if not isinstance(frame, dict):
+            await self.send_ack(None, Response(errors="Frame should be a valid JSON object"))
+            return
+
+        action = self.actions.get(frame.get('action'))
+        if action is None:
+            await self.send_ack(frame.get('request_id'), Response(errors="Unknown action"))
+            return
+
+        response = await getattr(self, action)(frame)
+        await self.send_ack(frame.get('request_id'), response)
+
+    async def send_chat_message(self, frame):
+        try:
+            recipient = await User.objects.aget(id=frame.get('recipient_id'))
+        except (User.DoesNotExist, ValidationError):
+            return Response(errors="Message recipient was not found")
+
+        serializer = ChatMessageUpdateSerializer(data=frame)
+        if not serializer.is_valid():
+            return Response(errors=serializer.errors)
+
+        message, created = await services.create_message(self.scope['user'], recipient,
+                                                         serializer.validated_data['text'])
+        data = ChatMessageGetSerializer(message).data
+        await self.join_chat(data['info']['chat_id'])
+
+        send_new_message(data, created, [self.user_id, recipient.id])
+        return Response(model=data, message="Message was created successfully")
+
+    async def edit_chat_message(self, frame):
+        message = await self.get_own_message(frame.get('id'))
+        if message is None:
+            return Response(errors="Message was not found")
+
+        serializer = ChatMessageUpdateSerializer(message, data=frame)
+        if not serializer.is_valid():
+            return Response(errors=serializer.errors)
+
+        message = await services.update_message(message, serializer.validated_data['text'])
+        data = ChatMessageGetSerializer(message).data
+
+        send_message('message.update', data, data['info']['chat_id'])
+        return Response(model=data, message="Message info was updated successfully")
+
+    async def delete_chat_message(self, frame):
+        message = await self.get_own_message(frame.get('id'))
+        if message is None:
+            return Response(errors="Message was not found")
+
+        message_id = message.id
+        chat_id = await services.delete_message(message)
+
+        send_message('message.delete', message_id, chat_id)
+        return Response(message="Message was deleted successfully")
+
+    async def send_typing(self, frame):
+        chat_id = frame.get('chat_id')
+        if chat_id not in self.chat_ids:
+            return Response(errors="Chat was not found")
+
+        send_message('message.typing', {'chat_id': chat_id, 'user_id': self.user_id}, chat_id)
+        return Response(message="Typing status was sent successfully")
+
+    async def get_own_message(self, message_id):
+        try:
+            return await services.get_user_message(self.scope['user'], message_id)
+        except (ChatMessage.DoesNotExist, ValueError, TypeError):
+            return None
+
+    async def join_chat(self, chat_id):
+        if chat_id not in self.chat_ids:
+            self.chat_ids.append(chat_id)
+            await self.channel_layer.group_add(get_chat_key(chat_id), self.channel_name)
+
+    async def send_ack(self, request_id, response):
+        await self.send_json({'type': 'ack', 'request_id': request_id, **response.to_dict()})
+
+    async def chat_join(self, text_data=None):
+        await self.join_chat(text_data['data']['info']['chat_id'])
+        await self.send_json({'type': 'message.send', 'data': text_data['data']})
+
     async def message_send(self, text_data=None):
         await self.send_json(text_data)
 
@@ -29,10 +137,19 @@ class ChatMessageConsumer(AsyncWebsocketConsumer):
     async def message_delete(self, text_data=None):
         await self.send_json(text_data)
 
+    async def message_read(self, text_data=None):
+        await self.send_json(text_data)
+
+    async def message_typing(self, text_data=None):
+        if text_data['data']['user_id'] != self.user_id:
+            await self.send_json(text_data)
+
     async def send_json(self, text_data=None):
         await self.send(json.dumps(text_data))
 
     async def disconnect(self, close_code):
+        if self.user_id is not None:
+            await self.channel_layer.group_discard(get_user_key(self.user_id), self.channel_name)
         for chat_id in self.chat_ids:
             await self.channel_layer.group_discard(get_chat_key(chat_id), self.channel_name)
         await super().disconnect(close_code)
@@ -44,8 +161,7 @@ def get_chat_ids(user_id):
 
 
 def send_message(message_type, data, chat_id):
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
+    publish(
         get_chat_key(chat_id),
         {
             'type': message_type,
@@ -54,5 +170,24 @@ def send_message(message_type, data, chat_id):
     )
 
 
+def send_new_message(data, created, user_ids):
+    if not created:
+        send_message('message.send', data, data['info']['chat_id'])
+        return
+
+    for user_id in user_ids:
+        publish(
+            get_user_key(user_id),
+            {
+                'type': 'chat.join',
+                'data': data
+            }
+        )
+
+
 def get_chat_key(chat_id):
     return f'chats_{chat_id}'
+
+
+def get_user_key(user_id):
+    return f'users_{user_id}'
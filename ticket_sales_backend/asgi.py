@@ -13,6 +13,7 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 from django.urls import path
 
+from core.websockets import EventPlaceConsumer
 from messenger.token_auth import JWTAuthMiddleware
 from messenger.websockets import ChatMessageConsumer
 
@@ -25,6 +26,7 @@ application = ProtocolTypeRouter({
     'websocket': JWTAuthMiddleware(
         URLRouter([
             path('ws/chats/', ChatMessageConsumer.as_asgi()),
+            path('ws/events/places/<int:event_id>/', EventPlaceConsumer.as_asgi()),
         ])
     ),
 })
@@ -31,10 +31,33 @@ DEBUG = True
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
 
+CHANNEL_LAYER_CAPACITY = int(os.getenv('CHANNEL_LAYER_CAPACITY', 100))
+
+CHANNEL_LAYER_BACKENDS = {
+    'memory': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        'CONFIG': {
+            'capacity': CHANNEL_LAYER_CAPACITY
+        }
+    },
+    'redis': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [os.getenv('CHANNEL_LAYER_URL', 'redis://127.0.0.1:6379/0')],
+            'capacity': CHANNEL_LAYER_CAPACITY
+        }
+    },
+    'sqlite': {
+        'BACKEND': 'messenger.layers.SQLiteChannelLayer',
+        'CONFIG': {
+            'path': os.getenv('CHANNEL_LAYER_PATH', os.path.join(BASE_DIR, 'channel_layer.sqlite3')),
+            'capacity': CHANNEL_LAYER_CAPACITY
+        }
+    },
+}
+
 CHANNEL_LAYERS = {
-  'default': {
-    'BACKEND': 'channels.layers.InMemoryChannelLayer'
-  }
+    'default': CHANNEL_LAYER_BACKENDS[os.getenv('CHANNEL_LAYER_BACKEND', 'memory')]
 }
 
 # Application definition
@@ -47,6 +70,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'daphne',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -110,6 +134,13 @@ SIMPLE_JWT = {
 
 ASGI_APPLICATION = 'ticket_sales_backend.asgi.application'
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -161,6 +192,41 @@ USE_TZ = True
 
 MAX_EVENT_PHOTOS = 6
 
+DISCOUNT_FACTOR_CACHE_TIMEOUT = 300
+
+SEAT_MAP_CACHE_TIMEOUT = 600
+
+PURCHASE_HOLD_TTL = timedelta(minutes=15)
+
+RELEASE_EXPIRED_HOLDS_BATCH_SIZE = 500
+
+OUTBOX_DRAIN_TIMEOUT = 10
+
+EVENT_ANNOUNCEMENT_CACHE_WINDOW = 60
+
+CURSOR_PAGE_SIZE = 50
+CURSOR_MAX_PAGE_SIZE = 200
+
+STREAMING_RESPONSE_CHUNK_SIZE = 500
+
+SEARCH_AUTOCOMPLETE_LIMIT = 10
+
+PLACE_BULK_BATCH_SIZE = 2000
+
+MAX_GENERATED_PLACES = 200000
+
+EVENT_PLACES_MATERIALIZATION = os.getenv('EVENT_PLACES_MATERIALIZATION', 'bulk')
+
+HALL_SCHEDULE_DEFAULT_DAYS = 31
+HALL_SCHEDULE_MAX_DAYS = 366
+
+RATING_HISTOGRAM_CACHE_TIMEOUT = 3600
+
+JWT_USER_CACHE_TIMEOUT = 300
+JWT_USER_BATCH_WINDOW = 0.005
+
+USER_PERMISSIONS_CACHE_TIMEOUT = 3600
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
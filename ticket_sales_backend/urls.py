@@ -24,8 +24,10 @@ from core.views import CityListView, UserRegistrationView, StadiumView, StadiumL
     EventPhotoView, EventPhotoListView, StadiumPhotoView, EventVideoListView, EventVideoView, UserListView, \
     EventRequestView, EventRequestPlaceView, EventRequestPlaceListView, EventPlaceListView, EventRequestUserListView, \
     EventRequestStadiumListView, PurchaseView, PurchaseCartView, PurchaseHistoryView, EventAnnouncementView, \
-    EventCatalogView, PromotionListView
-from messenger.views import ChatMessageView, ChatMessageListView, ChatListView
+    EventCatalogView, PromotionListView, EventSeatMapView, SearchAutocompleteView, PlaceLayoutView, \
+    HallFreeSlotsView, FeedbackHistogramView
+from messenger.async_views import AsyncChatListView, AsyncChatMessageListView, AsyncChatMessageView
+from messenger.views import ChatReadView
 from ticket_sales_backend import settings
 
 urlpatterns = [
@@ -33,6 +35,7 @@ urlpatterns = [
     path('api/register/', UserRegistrationView.as_view(), name='register'),
     path('api/login/', TokenObtainPairView.as_view(), name='login'),
     path('api/users/', UserListView.as_view(), name='user_list'),
+    path('api/search/autocomplete/', SearchAutocompleteView.as_view(http_method_names=['get'])),
     path('api/cities/', CityListView.as_view(), name='city_list'),
     path('api/stadiums/list/', StadiumListView.as_view(), name='stadium_list'),
     path('api/stadiums/', StadiumView.as_view(http_method_names=['post'])),
@@ -42,8 +45,10 @@ urlpatterns = [
     path('api/halls/list/<int:stadium_id>', HallListView.as_view(), name='hall_list'),
     path('api/halls/', HallView.as_view(http_method_names=['post'])),
     path('api/halls/<int:id>', HallView.as_view(http_method_names=['put', 'delete', 'get'])),
+    path('api/halls/free-slots/<int:hall_id>', HallFreeSlotsView.as_view(http_method_names=['get'])),
     path('api/places/list/<int:hall_id>', PlaceListView.as_view(), name='place_list'),
     path('api/places/', PlaceView.as_view(http_method_names=['post', 'put', 'delete'])),
+    path('api/places/generate/', PlaceLayoutView.as_view(http_method_names=['post'])),
     path('api/events/', EventView.as_view(http_method_names=['post'])),
     path('api/events/<int:id>', EventView.as_view(http_method_names=['put', 'delete', 'get'])),
     path('api/events/announcement/<int:city_id>', EventAnnouncementView.as_view(http_method_names=['get'])),
@@ -55,6 +60,7 @@ urlpatterns = [
     path('api/events/videos/', EventVideoView.as_view(http_method_names=['post'])),
     path('api/events/videos/<int:id>', EventVideoView.as_view(http_method_names=['delete'])),
     path('api/events/places/list/<int:event_id>', EventPlaceListView.as_view(http_method_names=['get'])),
+    path('api/events/places/map/<int:event_id>', EventSeatMapView.as_view(http_method_names=['get'])),
     path('api/event-requests/', EventRequestView.as_view(http_method_names=['post', 'put'])),
     path('api/event-requests/<int:id>', EventRequestView.as_view(http_method_names=['delete'])),
     path('api/event-requests/list/', EventRequestUserListView.as_view(http_method_names=['get'])),
@@ -65,6 +71,7 @@ urlpatterns = [
     path('api/promotions/<int:id>', PromotionView.as_view(http_method_names=['put', 'delete'])),
     path('api/promotions/list/<int:event_id>', PromotionListView.as_view(http_method_names=['get'])),
     path('api/feedbacks/list/<int:event_id>', FeedbackListView.as_view(http_method_names=['get'])),
+    path('api/feedbacks/histogram/<int:event_id>', FeedbackHistogramView.as_view(http_method_names=['get'])),
     path('api/feedbacks/', FeedbackView.as_view(http_method_names=['post'])),
     path('api/feedbacks/<int:id>', FeedbackView.as_view(http_method_names=['put', 'delete'])),
     path('api/purchase/', PurchaseView.as_view(http_method_names=['post', 'put'])),
@@ -72,10 +79,11 @@ urlpatterns = [
     path('api/purchase/cart/', PurchaseCartView.as_view(http_method_names=['get'])),
     path('api/purchase/history/', PurchaseHistoryView.as_view(http_method_names=['get'])),
     path('api/promotion-events/', PromotionEventView.as_view(http_method_names=['post', 'delete'])),
-    path('api/chats/', ChatListView.as_view(http_method_names=['get'])),
-    path('api/messages/', ChatMessageView.as_view(http_method_names=['post'])),
-    path('api/messages/<int:id>', ChatMessageView.as_view(http_method_names=['put', 'delete'])),
-    path('api/messages/list/<int:chat_id>', ChatMessageListView.as_view(http_method_names=['get'])),
+    path('api/chats/', AsyncChatListView.as_view(http_method_names=['get'])),
+    path('api/chats/read/', ChatReadView.as_view(http_method_names=['post'])),
+    path('api/messages/', AsyncChatMessageView.as_view(http_method_names=['post'])),
+    path('api/messages/<int:id>', AsyncChatMessageView.as_view(http_method_names=['put', 'delete'])),
+    path('api/messages/list/<int:chat_id>', AsyncChatMessageListView.as_view(http_method_names=['get'])),
 ]
 
 if settings.DEBUG: